@@ -14,6 +14,10 @@ Key integrations:
 - Authentication: JWT-based user authentication
 - Frontend: Serves React SPA and API endpoints
 
+Production launch (see Dockerfile):
+    uvicorn app.client:app --loop uvloop --http httptools
+Run a single worker: the MCP session pool and in-process caches are per process.
+
 Environment Variables:
 - MCP_SERVER_URL: URL for MCP server connection
 - LOG_LEVEL: Logging verbosity (DEBUG, INFO, WARNING, ERROR)
@@ -22,26 +26,42 @@ Environment Variables:
 
 import os
 import json
+import sys
+import queue
+import atexit
+import asyncio
 import logging
-import re
+import logging.config
+import logging.handlers
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 from fastapi import FastAPI, HTTPException, Request, Depends
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, FileResponse, PlainTextResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
+import orjson
 from mcp import ClientSession
 from mcp.client.streamable_http import streamablehttp_client
-from contextlib import AsyncExitStack
+from contextlib import AsyncExitStack, asynccontextmanager
 from datetime import timedelta
 from app.llm_client import LLMClient
 from app.prompts import *
 from app.database import init_db
-from app.middleware.analytics import setup_analytics_middleware
+from app.middleware.analytics import (
+    setup_analytics_middleware,
+    start_writer as start_analytics_writer,
+    stop_writer as stop_analytics_writer,
+)
 from app.services.analytics_service import analytics_service
+from app.utils.sql_parse import parse_sql_keys_bytes
+from app.utils.delta_batch import DeltaBatcher
 
 
 # Load environment variables from .env file in parent directory
@@ -57,6 +77,11 @@ BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # Project root directory
 STATIC_DIR = os.path.join(BASE_DIR, "static")  # Static assets (CSS, JS, images)
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")  # Jinja2 HTML templates
 
+# Log records are formatted on the calling thread and handed to a queue; a
+# background listener does the actual stdout write, so pipe backpressure in
+# containers never blocks the event loop inside a logger call.
+_log_queue = queue.SimpleQueue()
+
 # Configure structured logging for the entire application
 # This creates a consistent logging format across all components
 logging_config = {
@@ -72,8 +97,10 @@ logging_config = {
     "handlers": {
         "default": {
             "formatter": "default",  # Use the formatter defined above
-            "class": "logging.StreamHandler",  # Log to stdout/stderr
-            "stream": "ext://sys.stdout"  # Explicit stdout for container compatibility
+            "()": "logging.handlers.QueueHandler",  # Enqueue only; _log_listener writes to stdout
+            # The object itself: an ext://app.client... reference can't resolve
+            # while this module is still being imported
+            "queue": _log_queue
         }
     },
     "loggers": {
@@ -88,9 +115,9 @@ logging_config = {
             "level": LOG_LEVEL,
             "propagate": False
         },
-        "uvicorn.access": {  # HTTP access logs (requests, responses)
+        "uvicorn.access": {  # HTTP access logs; log_requests already emits one line per request
             "handlers": ["default"],
-            "level": LOG_LEVEL,
+            "level": "WARNING",
             "propagate": False
         },
         "app.middleware.analytics": {  # Analytics middleware logs
@@ -113,8 +140,30 @@ logging_config = {
 # Apply the logging configuration to the Python logging system
 logging.config.dictConfig(logging_config)
 
+# Drain the queue to stdout (explicit for container compatibility). Records are
+# already formatted by the QueueHandler, so the stream handler prints them as-is.
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler(sys.stdout))
+_log_listener.start()
+atexit.register(_log_listener.stop)  # Flush whatever is still queued on exit
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    ASGI lifespan: run startup_event, serve, then shutdown_event.
+
+    Both hooks are defined further down in this module and resolved at call time.
+    Cleanup runs even if startup fails part-way, so threads, pools and
+    connections opened before the failure are still released.
+    """
+    try:
+        await startup_event()
+        yield
+    finally:
+        await shutdown_event()
+
+
 # Initialize the FastAPI application instance
-app = FastAPI(title="MCP Client")  # Creates the main web application
+app = FastAPI(title="MCP Client", default_response_class=ORJSONResponse, lifespan=lifespan)  # Creates the main web application
 
 # Mount static file serving for CSS, JS, images, etc.
 # This serves files from /static directory at /static URL path
@@ -123,16 +172,48 @@ app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 # Initialize Jinja2 template engine for serving HTML templates
 templates = Jinja2Templates(directory=TEMPLATES_DIR)
 
+# Rendered bodies of the static HTML pages below. ui.html is the Vite build
+# output and the sync/describe pages take no context, so each is rendered once
+# (on first request, since ui.html only exists after the UI build) and reused.
+_page_cache: Dict[str, bytes] = {}
+
+# These pages only change on deploy (bundles are content-hashed), so browsers
+# and CDNs may reuse them briefly and revalidate in the background.
+_STATIC_PAGE_HEADERS = {"Cache-Control": "public, max-age=300, stale-while-revalidate=3600"}
+
+
+def _static_page(name: str) -> HTMLResponse:
+    body = _page_cache.get(name)
+    if body is None:
+        body = templates.get_template(name).render().encode("utf-8")
+        _page_cache[name] = body
+    return HTMLResponse(body, headers=_STATIC_PAGE_HEADERS)
+
 # Add CORS (Cross-Origin Resource Sharing) middleware
 # This allows the React frontend to make API calls to this backend
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # WARNING: In production, specify exact frontend URL instead of wildcard
     allow_credentials=True,  # Allow cookies and authorization headers
-    allow_methods=["*"],  # Allow all HTTP methods (GET, POST, PUT, DELETE, etc.)
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE"],  # Only the methods our routes expose
     allow_headers=["*"],  # Allow all request headers
+    max_age=int(os.getenv("CORS_MAX_AGE", "86400")),  # Let browsers cache preflight responses (seconds)
 )
 
+
+class _SelectiveGZipMiddleware(GZipMiddleware):
+    """GZip responses except incremental progress streams, which must reach the browser unbuffered."""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].endswith("-stream"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Compress HTML pages and large JSON payloads (schema maps, query rows) on the wire
+app.add_middleware(_SelectiveGZipMiddleware, minimum_size=512, compresslevel=6)
+
 # Setup analytics middleware that logs every HTTP request
 # This must be added after CORS but before route handlers
 setup_analytics_middleware(app)
@@ -143,6 +224,7 @@ logger = logging.getLogger("uvicorn.error")
 # Import all route modules that define API endpoints
 # These imports must be after app creation to avoid circular dependencies
 from app.routes.db_routes import router as db_router  # Database operations
+from app.routes.db_routes import invalidate_delta_cache  # Confluence empty-delta cache, dropped on page writes
 from app.routes.mcp_routes import router as mcp_router  # MCP server interactions
 from app.routes.auth_routes import router as auth_router  # Authentication endpoints
 from app.routes.users_routes import router as users_router  # User management
@@ -348,9 +430,10 @@ async def user_stats_endpoint(
 # Lightweight request logging middleware (doesn't consume body)
 @app.middleware("http")  # Decorator registers this function as HTTP middleware that runs on every request
 async def log_requests(request: Request, call_next):
+    # Skip all logging work when INFO would be discarded anyway
+    if not logger.isEnabledFor(logging.INFO):
+        return await call_next(request)
     try:
-        # Log the incoming request method and path (e.g., "GET /api/users")
-        logger.info("%s %s", request.method, request.url.path)
         # Call the next middleware or route handler and get the response
         response = await call_next(request)
         # Log the completed request with status code (e.g., "GET /api/users -> 200")
@@ -363,11 +446,75 @@ async def log_requests(request: Request, call_next):
         # Re-raise the exception so FastAPI can handle it properly
         raise
 
+def _short_error(exc: BaseException, limit: int = 512, use_repr: bool = False) -> str:
+    """
+    Bound an exception message for use as an HTTPException detail.
+
+    MCP tool errors can embed whole responses or SQL payloads; echoing them
+    verbatim makes the error path encode and log megabytes. The full error is
+    still available to the handler's own logging.
+    """
+    text = repr(exc) if use_repr else str(exc)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [+{len(text) - limit} chars]"
+
+
 # Global variables to manage MCP (Model Context Protocol) connection lifecycle
 # AsyncExitStack manages async context managers (like connections) in the same task
 _exit_stack: AsyncExitStack
 # ClientSession holds the actual MCP connection to the AI model
 _mcp_session: ClientSession
+# Pool of sessions to the same server (filled by /api/mcp/connect); _mcp_session is its first member
+_mcp_pool: Optional[asyncio.Queue] = None
+# Exit stack owning the current pool's transports and sessions; replaced (and closed) on reconnect
+_mcp_pool_stack: Optional[AsyncExitStack] = None
+# Worker processes for CPU-bound SQL parsing in the PR webhook (regex loops hold the GIL)
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+
+@asynccontextmanager
+async def get_session():
+    """
+    Check an MCP session out of the pool for the duration of the block.
+
+    Falls back to the primary session when no pool has been opened yet.
+    """
+    pool = _mcp_pool
+    if pool is None:
+        yield _mcp_session
+        return
+    session = await pool.get()
+    try:
+        yield session
+    finally:
+        pool.put_nowait(session)
+
+
+async def _call_tool(name: str, arguments: Optional[Dict[str, Any]] = None, **kwargs):
+    """Run a single MCP tool call on a pooled session (kwargs go to call_tool, e.g. read_timeout_seconds)."""
+    async with get_session() as session:
+        return await session.call_tool(name, arguments=arguments, **kwargs)
+
+
+class _PooledSession:
+    """
+    Session-like view over the pool for the LLM tool loop.
+
+    process_query() can run for minutes across LLM rounds; checking a session
+    out per MCP call (instead of for the whole conversation) keeps long
+    webhook analyses from starving other tool calls of pooled sessions.
+    """
+
+    async def list_tools(self):
+        async with get_session() as session:
+            return await session.list_tools()
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None, **kwargs):
+        return await _call_tool(name, arguments, **kwargs)
+
+
+_pooled_session = _PooledSession()
 
 
 # Global LLM client instance
@@ -380,25 +527,20 @@ class QueryRequest(BaseModel):
 class QueryResponse(BaseModel):
     answer: str = Field(..., description="The LLM’s final answer")
 
+class DescribeRequest(BaseModel):
+    host: str
+    port: int
+    user: str
+    password: str
+    database: str
+    table: str
+    limit: int
+    space: str = Field(..., description="Confluence space key")
+    title: str = Field(..., description="Confluence page title")
 
-@app.on_event("startup")
-async def startup_event():
-    """
-    Application startup initialization.
-    """
-    global _exit_stack, _mcp_session  # Access global variables for MCP connection management
-    _exit_stack = AsyncExitStack()  # Create stack to manage multiple async context managers
-    _mcp_session = None
-
-    logger.info("Starting without initial MCP connection. Connect dynamically via the Tests tab.")
-
-    # Initialize the database by creating all tables defined in models.py
-    init_db()
 
-    start_ttl_cleanup_thread()
-    start_cluster_sync_thread()
-
-    # Initialize analytics system for real-time data collection
+def _init_analytics():
+    """Initialize the analytics system; failures are logged, never fatal."""
     from app.database import SessionLocal  # Import database session factory
     db = SessionLocal()  # Create a new database session
     try:
@@ -411,33 +553,81 @@ async def startup_event():
     finally:
         db.close()  # Always close the database session to prevent connection leaks
 
-    # Start analytics monitoring background tasks for real-time metrics collection
-    await analytics_service.start_monitoring()
 
-    # Initialize the LLM client for AI model interactions
-    llm_client = LLMClient()  # Create instance of language model client
+async def startup_event():
+    """
+    Application startup initialization.
+    """
+    global _exit_stack, _mcp_session, _parse_pool  # Access global variables for MCP connection management
+    _exit_stack = AsyncExitStack()  # Create stack to manage multiple async context managers
+    _mcp_session = None
+
+    # Warm the parse pool now so the first burst PR doesn't pay worker start-up.
+    # By this point the log listener and analytics writer threads are already
+    # running, so workers come from a forkserver (spawn where unavailable)
+    # rather than forking this multi-threaded process.
+    parse_workers = min(8, os.cpu_count() or 1)
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    mp_context = multiprocessing.get_context(start_method)
+    if start_method == "forkserver":
+        mp_context.set_forkserver_preload(["app.utils.sql_parse"])
+    _parse_pool = ProcessPoolExecutor(max_workers=parse_workers, mp_context=mp_context)
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*[loop.run_in_executor(_parse_pool, int) for _ in range(parse_workers)])
+
+    logger.info("Starting without initial MCP connection. Connect dynamically via the Tests tab.")
+
+    # Phase 1 (independent): DB bootstrap can block for a while on retries, so it
+    # runs off the event loop while the LLM client is built in parallel.
+    # init_db creates all tables defined in models.py.
+    _, llm_client = await asyncio.gather(
+        asyncio.to_thread(init_db),
+        asyncio.to_thread(LLMClient),  # Create instance of language model client
+    )
     globals()["llm_client"] = llm_client  # Make it globally accessible to all route handlers
     logger.info("LLMClient initialized and ready.")
 
+    # Phase 2 (needs the DB): background threads and analytics
+    start_ttl_cleanup_thread()
+    start_cluster_sync_thread()
+    start_analytics_writer()  # no-op unless a previous shutdown stopped it
+    await asyncio.gather(
+        asyncio.to_thread(_init_analytics),
+        # Start analytics monitoring background tasks for real-time metrics collection
+        analytics_service.start_monitoring(),
+    )
+
 
-@app.on_event("shutdown")  # Decorator registers this function to run when FastAPI shuts down
 async def shutdown_event():
     """
     Application shutdown cleanup.
     
     This function runs when the FastAPI server is shutting down and performs:
-    1. Stops analytics monitoring background tasks
+    1. Stops analytics monitoring background tasks and drains the analytics writer
     2. Closes all MCP connections and async context managers
     3. Cleans up resources to prevent memory leaks
     """
     logger.info("shutdown_event: enter")
     try:
-        # Stop analytics monitoring background tasks gracefully
-        await analytics_service.stop_monitoring()
-        
-        # Close all async context managers managed by the exit stack
-        # This includes MCP session and HTTP transport connections
-        await _exit_stack.aclose()
+        try:
+            try:
+                # Stop analytics monitoring background tasks gracefully
+                await analytics_service.stop_monitoring()
+            finally:
+                # Write out analytics events still queued for the writer thread
+                await asyncio.to_thread(stop_analytics_writer)
+        finally:
+            try:
+                # Close all async context managers managed by the exit stack
+                # This includes MCP session and HTTP transport connections
+                try:
+                    if _mcp_pool_stack is not None:
+                        await _mcp_pool_stack.aclose()
+                finally:
+                    await _exit_stack.aclose()
+            finally:
+                if _parse_pool is not None:
+                    _parse_pool.shutdown(wait=False, cancel_futures=True)
     except Exception as e:
         # Log any errors during shutdown but don't crash
         logger.error("shutdown_event: error during aclose(): %s", e, exc_info=True)
@@ -445,6 +635,11 @@ async def shutdown_event():
         logger.info("shutdown_event: exit cleanly")
 
 
+# Constant JSON bodies, encoded once instead of on every error/health probe
+_ISE_BODY = b'{"detail":"Internal Server Error"}'
+_HEALTH_BODY = b'{"status":"ok","service":"mcp-client"}'
+
+
 @app.exception_handler(Exception)  # Global exception handler for any unhandled exceptions
 async def global_exception_handler(request: Request, exc: Exception):
     """
@@ -458,7 +653,7 @@ async def global_exception_handler(request: Request, exc: Exception):
     # Log the full error with request context and stack trace
     logger.error("Unhandled exception during request %s %s: %s", request.method, request.url, exc, exc_info=True)
     # Return standardized JSON error response to client
-    return JSONResponse({"detail": "Internal Server Error"}, status_code=500)
+    return Response(content=_ISE_BODY, status_code=500, media_type="application/json")
 
 @app.get("/", response_class=HTMLResponse)  # Root route serves the React SPA
 async def spa_root(request: Request):
@@ -470,7 +665,7 @@ async def spa_root(request: Request):
     """
     # Use Jinja2 template engine to render the main UI template
     # templates points to your templates directory containing ui.html
-    return templates.TemplateResponse("ui.html", {"request": request})
+    return _static_page("ui.html")
 
 
 @app.post("/events/code-analysis", status_code=202)
@@ -488,7 +683,7 @@ async def code_analysis_endpoint(request: Request) -> QueryResponse:
     
     **Request Flow**:
     1. Receives JSON payload containing analysis reports
-    2. Logs full payload for audit and debugging
+    2. Logs full payload at DEBUG level for troubleshooting
     3. Formats data using CODE_ANALYSIS_PROMPT template
     4. Sends to LLM via MCP session for analysis
     5. Returns AI-generated insights and recommendations
@@ -512,29 +707,30 @@ async def code_analysis_endpoint(request: Request) -> QueryResponse:
     """
     # 1️⃣  Parse the raw JSON body from the incoming HTTP request
     try:
-        payload = await request.json()  # Extract JSON payload from request body
+        payload = orjson.loads(await request.body())  # Extract JSON payload from request body
     except json.JSONDecodeError as err:
         # If JSON is malformed, log error and return 400 Bad Request
         logger.error("Invalid JSON body: %s", err, exc_info=True)
         raise HTTPException(status_code=400, detail="Body must be valid JSON")
 
-    # 2️⃣  Log the entire payload for debugging and audit trail
+    # Serialize once; the same pretty-printed text feeds the log and the prompt
+    reports_json = orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode()
+
+    # 2️⃣  Log the entire payload for debugging (can be large, so DEBUG only)
     # This helps track what data was received for troubleshooting
-    logger.info("Received code-analysis payload:\n%s",
-                json.dumps(payload, indent=2, ensure_ascii=False))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Received code-analysis payload:\n%s", reports_json)
 
     # 3️⃣  Build the LLM prompt using the predefined template
     # CODE_ANALYSIS_PROMPT contains instructions for how to analyze the code reports
-    prompt_text = CODE_ANALYSIS_PROMPT.format(
-        reports_json=json.dumps(payload, indent=2, ensure_ascii=False)  # Insert JSON into template
-    )
+    prompt_text = render_code_analysis_prompt(reports_json)  # Insert JSON into template
 
     # 4️⃣  Send the formatted prompt to the LLM via MCP session and return response
     try:
         # Process the query through the LLM client using the established MCP session
         answer = await llm_client.process_query(
-            user_query=prompt_text,  # The formatted prompt with code analysis data
-            session=_mcp_session     # Global MCP session for AI communication
+            user_query=prompt_text,   # The formatted prompt with code analysis data
+            session=_pooled_session   # Pooled MCP sessions for AI communication
         )
         # Log the LLM's response for debugging and monitoring
         logger.info("LLM Final Answer:\n%s", answer)
@@ -543,104 +739,93 @@ async def code_analysis_endpoint(request: Request) -> QueryResponse:
     except Exception as err:
         # If LLM processing fails, log error and return 500 Internal Server Error
         logger.error("❌  LLM processing failed: %s", err, exc_info=True)
-        raise HTTPException(status_code=500, detail=str(err))
-
-
-@app.post("/events/jira", status_code=202)
-async def jira_endpoint(request: Request):
-    """
-    Webhook endpoint for JIRA ticket analysis and investigation.
-    
-    This endpoint processes JIRA webhook events to automatically investigate
-    and analyze tickets using AI-powered insights.
-    
-    **Use Case**:
-    - Triggered when JIRA tickets are created or updated
-    - Automatically analyzes ticket content for context and severity
-    - Provides AI-driven investigation recommendations
-    - Links related incidents and knowledge base articles
-    
-    **Request Flow**:
-    1. Receives JIRA webhook with ticket information
-    2. Extracts ticket ID from the message field
-    3. Uses JIRA_INVESTIGATION_USER_PROMPT to analyze ticket
-    4. Queries LLM for investigation insights and recommendations
-    5. Returns structured analysis for ticket context
-    
-    **Expected Message Format**:
-    ```json
-    {
-        "message": "{\"field\": \"ticket_id\", \"value\": \"PROJ-123\"}"
-    }
-    ```
-    
-    **AI Analysis Includes**:
-    - Ticket severity assessment
-    - Related incident correlation
-    - Investigation steps recommendations
-    - Resource and documentation links
-    
-    **Integration Points**:
-    - JIRA webhooks for ticket events
-    - ServiceNow for incident management
-    - Knowledge base systems
-    - Monitoring and alerting platforms
-    """
-
-    evt = await request.json()
-    raw_msg = evt.get("message")
-
-    if raw_msg is None:
-        logger.error("Jira ticket missing 'message' field. What we got: %s", evt)
-        raise HTTPException(status_code=400, detail="Missing message field")
-    
-    try:
-        parsed = json.loads(raw_msg)
-    except json.JSONDecodeError as e:
-        logger.exception("Failed to parse jira message JSON: %s", raw_msg)
-        raise HTTPException(status_code=400, detail="Invalid JSON in message")
-
-    value = parsed.get("value")
-    field = parsed.get("field")
-    logger.info("Parsed anomaly with field = %s value = %s", field, value)
-    user_query = JIRA_INVESTIGATION_USER_PROMPT.format(ticket_id=value)
-
-    try:
-        answer = await llm_client.process_query(user_query=user_query, session=_mcp_session)
-        logger.info(f"LLM Final Answer: {answer}")
-        return QueryResponse(answer=answer)
-    except Exception as e:
-        logger.error("❌  run_query failed: %s", e, exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@app.post("/events/jenkins", status_code=202)
-async def jenkins_anomaly_endpoint(request: Request):
-    evt = await request.json()
-    raw_msg = evt.get("message")
-
-    if raw_msg is None:
-        logger.error("Anomaly webhook missing 'message' field. What we got: %s", evt)
-        raise HTTPException(status_code=400, detail="Missing message field")
-    
-    try:
-        parsed = json.loads(raw_msg)
-    except json.JSONDecodeError as e:
-        logger.exception("Failed to parse anomaly message JSON: %s", raw_msg)
-        raise HTTPException(status_code=400, detail="Invalid JSON in message")
-
-    value = parsed.get("value")
-    field = parsed.get("field")
-    logger.info("Parsed anomaly with field = %s value = %s", field, value)
-    user_query = JENKINS_INVESTIGATION_USER_PROMPT.format(trace_id=value)
+        raise HTTPException(status_code=500, detail=_short_error(err))
+
+
+def _make_event_handler(name: str, label: str, render_prompt, doc: str = None):
+    """
+    Build a webhook handler for ``{"message": "{\"field\": ..., \"value\": ...}"}``
+    envelopes: parse the message, render ``render_prompt(value)`` and run it
+    through the LLM tool loop. Jira and Jenkins events differ only in prompt.
+    """
+    async def handler(request: Request):
+        evt = orjson.loads(await request.body())
+        raw_msg = evt.get("message")
+
+        if raw_msg is None:
+            logger.error("%s missing 'message' field. What we got: %s", label, evt)
+            raise HTTPException(status_code=400, detail="Missing message field")
+
+        try:
+            parsed = orjson.loads(raw_msg)
+        except json.JSONDecodeError:
+            logger.exception("Failed to parse %s message JSON: %s", label, raw_msg)
+            raise HTTPException(status_code=400, detail="Invalid JSON in message")
+
+        value = parsed.get("value")
+        field = parsed.get("field")
+        logger.info("Parsed anomaly with field = %s value = %s", field, value)
+        user_query = render_prompt(value)
+
+        try:
+            answer = await llm_client.process_query(user_query=user_query, session=_pooled_session)
+            logger.info("LLM Final Answer: %s", answer)
+            return QueryResponse(answer=answer)
+        except Exception as e:
+            logger.error("❌  run_query failed: %s", e, exc_info=True)
+            raise HTTPException(status_code=500, detail=_short_error(e))
+
+    # Keep distinct names/docs so the OpenAPI operations stay as they were
+    handler.__name__ = handler.__qualname__ = name
+    handler.__doc__ = doc
+    return handler
+
+
+_JIRA_ENDPOINT_DOC = """
+Webhook endpoint for JIRA ticket analysis and investigation.
+
+This endpoint processes JIRA webhook events to automatically investigate
+and analyze tickets using AI-powered insights.
+
+**Use Case**:
+- Triggered when JIRA tickets are created or updated
+- Automatically analyzes ticket content for context and severity
+- Provides AI-driven investigation recommendations
+- Links related incidents and knowledge base articles
+
+**Request Flow**:
+1. Receives JIRA webhook with ticket information
+2. Extracts ticket ID from the message field
+3. Uses JIRA_INVESTIGATION_USER_PROMPT to analyze ticket
+4. Queries LLM for investigation insights and recommendations
+5. Returns structured analysis for ticket context
+
+**Expected Message Format**:
+```json
+{
+    "message": "{\"field\": \"ticket_id\", \"value\": \"PROJ-123\"}"
+}
+```
+
+**AI Analysis Includes**:
+- Ticket severity assessment
+- Related incident correlation
+- Investigation steps recommendations
+- Resource and documentation links
+
+**Integration Points**:
+- JIRA webhooks for ticket events
+- ServiceNow for incident management
+- Knowledge base systems
+- Monitoring and alerting platforms
+"""
 
-    try:
-        answer = await llm_client.process_query(user_query=user_query, session=_mcp_session)
-        logger.info(f"LLM Final Answer: {answer}")
-        return QueryResponse(answer=answer)
-    except Exception as e:
-        logger.error("❌  run_query failed: %s", e, exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+jira_endpoint = app.post("/events/jira", status_code=202)(
+    _make_event_handler("jira_endpoint", "Jira ticket", render_jira_investigation_prompt, _JIRA_ENDPOINT_DOC)
+)
+jenkins_anomaly_endpoint = app.post("/events/jenkins", status_code=202)(
+    _make_event_handler("jenkins_anomaly_endpoint", "Anomaly webhook", render_jenkins_investigation_prompt)
+)
 
 
 @app.get("/health")
@@ -649,7 +834,7 @@ async def health_check():
     General API health check endpoint
     """
     logger.info("Health check called")
-    return {"status": "ok", "service": "mcp-client"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
 @app.get("/api/app-config")
@@ -669,6 +854,14 @@ async def get_app_config():
 
 
 
+# The tool list rarely changes while a session is up; UI polling reuses it for
+# _TOOLS_TTL seconds. Entries are (fetched_at, session, result) so reconnecting
+# to another MCP server invalidates the cache.
+_TOOLS_TTL = 60
+_tools_cache: Optional[Tuple[float, Any, Dict[str, Any]]] = None
+_tools_lock = asyncio.Lock()
+
+
 @app.get("/tools", summary="List MCP server tools")
 async def list_tools() -> Dict[str, Any]:
     """
@@ -677,17 +870,30 @@ async def list_tools() -> Dict[str, Any]:
     Returns:
         JSON containing tool names and descriptions.
     """
-    try:
-        tools_result = await _mcp_session.list_tools()
-    except Exception as e:
-        logger.error("Failed to list tools: %s", e)
-        raise HTTPException(status_code=500, detail="Could not retrieve tools list")
-
-    tools_info = [
-        {"name": tool.name, "description": tool.description}
-        for tool in tools_result.tools
-    ]
-    return {"tools": tools_info}
+    global _tools_cache
+    session = _mcp_session
+    cached = _tools_cache
+    if cached and cached[1] is session and time.monotonic() - cached[0] < _TOOLS_TTL:
+        return cached[2]
+
+    # Coalesce concurrent refreshes into a single list_tools round-trip
+    async with _tools_lock:
+        cached = _tools_cache
+        if cached and cached[1] is session and time.monotonic() - cached[0] < _TOOLS_TTL:
+            return cached[2]
+        try:
+            tools_result = await session.list_tools()
+        except Exception as e:
+            logger.error("Failed to list tools: %s", e)
+            raise HTTPException(status_code=500, detail="Could not retrieve tools list")
+
+        tools_info = [
+            {"name": tool.name, "description": tool.description}
+            for tool in tools_result.tools
+        ]
+        result = {"tools": tools_info}
+        _tools_cache = (time.monotonic(), session, result)
+        return result
 
 
 async def run_query(user_query: str):
@@ -696,12 +902,12 @@ async def run_query(user_query: str):
     and returns the final answer.
     """
     try:
-        answer = await llm_client.process_query(user_query, _mcp_session)
+        answer = await llm_client.process_query(user_query, _pooled_session)
         return QueryResponse(answer=answer)
     
     except Exception as e:
         logger.error("Error in process_query: %s", e, exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=_short_error(e))
 
 
 @app.get("/prompt-test")
@@ -719,9 +925,9 @@ async def enhance_query():
     
     except Exception as e:
         logger.error("Error enhancing query: %s", e, exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=_short_error(e))
     
-@app.get("/console-test")
+@app.get("/console-test", response_class=PlainTextResponse)
 async def get_console(job_name: str, build_number: str):
     """
     Fetch the full Jenkins console output for the given job and build.
@@ -729,7 +935,7 @@ async def get_console(job_name: str, build_number: str):
       http://localhost:8000/console-test?job_name=my-job&build_number=42
     """
     try:
-        result = await _mcp_session.call_tool(
+        result = await _call_tool(
             "fetch_job_console_output",
             arguments={"job_name": job_name, "build_number": build_number}
         )
@@ -737,15 +943,15 @@ async def get_console(job_name: str, build_number: str):
         return console_text
     
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=_short_error(e))
 
-@app.get("/window-test")
+@app.get("/window-test", response_class=PlainTextResponse)
 async def window_test(job_name: str, build_number: str):
     """
       http://localhost:8000/window-test?job_name=my-job&build_number=42
     """
     try:
-        result = await _mcp_session.call_tool(
+        result = await _call_tool(
             "retrieve_job_logs_window_time",
             arguments={"root_job": job_name, "root_build": build_number}
         )
@@ -753,9 +959,9 @@ async def window_test(job_name: str, build_number: str):
         return console_text
     
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=_short_error(e))
     
-@app.get("/log-paths-test")
+@app.get("/log-paths-test", response_class=PlainTextResponse)
 async def log_paths_test(
     environment: str,
     vm_name: str,
@@ -771,7 +977,7 @@ async def log_paths_test(
         end_time=2025-06-08T12:30:00Z
     """
     try:
-        res = await _mcp_session.call_tool(
+        res = await _call_tool(
             "fetch_server_log_file_paths",
             arguments={
                 "environment": environment,
@@ -783,10 +989,10 @@ async def log_paths_test(
         # return the parsed JSON body of the tool response
         return res.content[0].text
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=_short_error(e))
 
 
-@app.get("/app-logs-for-paths-test")
+@app.get("/app-logs-for-paths-test", response_class=PlainTextResponse)
 async def app_logs_for_paths_test(
     environment: str,
     vm_name: str,
@@ -804,8 +1010,12 @@ async def app_logs_for_paths_test(
         paths=C:\\APP\\Logs\\file1.log,C:\\APP\\Logs\\file2.log
     """
     try:
-        log_list = paths.split(",")
-        result = await _mcp_session.call_tool(
+        # Single path is the common case; trim whitespace and drop empty entries
+        if "," in paths:
+            log_list = [p.strip() for p in paths.split(",") if p.strip()]
+        else:
+            log_list = [paths.strip()]
+        result = await _call_tool(
             "fetch_application_server_logs_by_path",
             arguments={
                 "environment":    environment,
@@ -818,7 +1028,7 @@ async def app_logs_for_paths_test(
         print(result.content[0].text)
         return result.content[0].text
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=_short_error(e))
 
 
 @app.get("/containers-test")
@@ -837,7 +1047,7 @@ async def containers_test(
         end_time=2025-06-08T23:59:59Z
     """
     try:
-        res = await _mcp_session.call_tool(
+        res = await _call_tool(
             "fetch_containers_for_server",
             arguments={
                 "environment": environment,
@@ -849,10 +1059,10 @@ async def containers_test(
         # returns a JSON map of app → [container_ids]
         return res.content[0].json()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=_short_error(e))
 
 
-@app.get("/logs-for-container-test")
+@app.get("/logs-for-container-test", response_class=PlainTextResponse)
 async def logs_for_container_test(
     environment: str,
     vm_name: str,
@@ -870,7 +1080,7 @@ async def logs_for_container_test(
         end_time=2025-06-08T23:59:59Z
     """
     try:
-        res = await _mcp_session.call_tool(
+        res = await _call_tool(
             "fetch_logs_for_container",
             arguments={
                 "environment":  environment,
@@ -883,7 +1093,7 @@ async def logs_for_container_test(
         # returns newline-delimited log messages as plain text
         return res.content[0].text
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=_short_error(e))
 
 
 
@@ -897,7 +1107,7 @@ async def build_parameters_test(
       http://localhost:8000/build-parameters-test?job_name=my-job&build_number=42
     """
     try:
-        res = await _mcp_session.call_tool(
+        res = await _call_tool(
             "fetch_jenkins_build_parameters",
             arguments={
                 "job_name": job_name,
@@ -907,7 +1117,7 @@ async def build_parameters_test(
         # returns a JSON dict of parameter names to values
         return res.content[0].json()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=_short_error(e))
     
 
 @app.get("/build-time-window-test")
@@ -920,7 +1130,7 @@ async def build_time_window_test(
       http://localhost:8000/build-time-window-test?job_name=my-job&build_number=42
     """
     try:
-        res = await _mcp_session.call_tool(
+        res = await _call_tool(
             "fetch_build_time_window",
             arguments={
                 "job_name":     job_name,
@@ -930,10 +1140,10 @@ async def build_time_window_test(
         # returns a JSON dict with start_time and end_time
         return res.content[0].json()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=_short_error(e))
 
 
-@app.get("/job-console-test")
+@app.get("/job-console-test", response_class=PlainTextResponse)
 async def job_console_test(
     job_name: str,
     build_number: int
@@ -943,17 +1153,17 @@ async def job_console_test(
       http://localhost:8000/job-console-test?job_name=my-job&build_number=42
     """
     try:
-        res = await _mcp_session.call_tool(
+        res = await _call_tool(
             "fetch_job_console_output",
             arguments={"job_name": job_name, "build_number": build_number}
         )
         # return the raw console text
         return res.content[0].text
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=_short_error(e))
 
 
-@app.get("/downstream-test")
+@app.get("/downstream-test", response_class=PlainTextResponse)
 async def job_console_test(
     job_name: str,
     build_number: int
@@ -963,16 +1173,16 @@ async def job_console_test(
       http://localhost:8000/downstream-test?job_name=my-job&build_number=42
     """
     try:
-        res = await _mcp_session.call_tool(
+        res = await _call_tool(
             "fetch_root_and_all_downstream_jobs_outputs",
             arguments={"root_job": job_name, "root_build": build_number}
         )
         # return the raw console text
         return res.content[0].text
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=_short_error(e))
     
-@app.get("/get-confluence-page-test")
+@app.get("/get-confluence-page-test", response_class=PlainTextResponse)
 async def get_confluence_page_test(
     space: str,
     title: str
@@ -982,7 +1192,7 @@ async def get_confluence_page_test(
       http://localhost:8000/get-confluence-page-test?space=AAA&title=Demo%20-%20database%20keys%20description
     """
     try:
-        res = await _mcp_session.call_tool(
+        res = await _call_tool(
             "get_confluence_page_content",
             arguments={"space": space, "title": title}
         )
@@ -991,9 +1201,9 @@ async def get_confluence_page_test(
     except Exception as e:
         logger.error("Error in get_confluence_page_content:", exc_info=True)
         # include repr(e) so even empty messages show their type
-        raise HTTPException(status_code=500, detail=repr(e))
+        raise HTTPException(status_code=500, detail=_short_error(e, use_repr=True))
 
-@app.get("/list-databases-test")
+@app.get("/list-databases-test", response_class=PlainTextResponse)
 async def list_database_test(
         host: str,
         port: int,
@@ -1005,16 +1215,16 @@ async def list_database_test(
       http://localhost:8000/list-databases-test?host=<ip>&port=5432&user=malluser&password=mall
     """
     try:
-        res = await _mcp_session.call_tool(
+        res = await _call_tool(
             "list_databases",
             arguments={"host": host, "port": port, "user": user, "password": password}
         )
         # return the raw console text
         return res.content[0].text
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=_short_error(e))
 
-@app.get("/bitbucket-comment-test")
+@app.get("/bitbucket-comment-test", response_class=PlainTextResponse)
 async def bitbucket_comment_test(
     pr_id: int,
     comment: str,
@@ -1040,13 +1250,13 @@ async def bitbucket_comment_test(
         if repo:
             arguments["repo"] = repo
 
-        result = await _mcp_session.call_tool("post_bitbucket_comment", arguments=arguments)
+        result = await _call_tool("post_bitbucket_comment", arguments=arguments)
 
         return result.content[0].text
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=_short_error(e))
     
-@app.get("/list-bitbucket-files-test")
+@app.get("/list-bitbucket-files-test", response_class=PlainTextResponse)
 async def list_bitbucket_files_test(
     project: str,
     repo:    str,
@@ -1059,7 +1269,7 @@ async def list_bitbucket_files_test(
         project=<PROJ>&repo=<repo>&path=<optional>&at_ref=<branch>
     """
     try:
-        res = await _mcp_session.call_tool(
+        res = await _call_tool(
             "list_bitbucket_files",
             arguments={
                 "project": project,
@@ -1071,10 +1281,10 @@ async def list_bitbucket_files_test(
         chunks = [msg.text for msg in res.content]
         return "\n".join(chunks)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=_short_error(e))
 
 
-@app.get("/list-tables-test")
+@app.get("/list-tables-test", response_class=PlainTextResponse)
 async def list_tables_test(
     host: str,
     port: int,
@@ -1093,7 +1303,7 @@ async def list_tables_test(
     Supports both Postgres and MSSQL by passing `database_type`.
     """
     try:
-        res = await _mcp_session.call_tool(
+        res = await _call_tool(
             "list_database_tables",
             arguments={
                 "host": host,
@@ -1108,10 +1318,10 @@ async def list_tables_test(
         return "\n".join(chunks)
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=_short_error(e))
 
 
-@app.get("/list-all-keys-test")
+@app.get("/list-all-keys-test", response_class=PlainTextResponse)
 async def list_keys_test(
     host: str,
     port: int,
@@ -1130,7 +1340,7 @@ async def list_keys_test(
     Supports both Postgres and MSSQL by passing `database_type`.
     """
     try:
-        res = await _mcp_session.call_tool(
+        res = await _call_tool(
             "list_database_keys",
             arguments={
                 "host": host,
@@ -1145,66 +1355,59 @@ async def list_keys_test(
         return "\n".join(chunks)
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=_short_error(e))
 
 
 @app.post("/describe-all-columns")
-async def describe_api(request: Request):
-    data = await request.json()
-    # now require space/title too
-    required = ["host","port","user","password","database","table","limit","space","title"]
-    for f in required:
-        if f not in data:
-            raise HTTPException(400, f"Missing {f}")
-
+async def describe_api(req: DescribeRequest):
     # 1️⃣ call describe_table_columns
-    res = await _mcp_session.call_tool(
+    res = await _call_tool(
         "describe_table_columns",
-        arguments={
-            "host":     data["host"],
-            "port":     data["port"],
-            "user":     data["user"],
-            "password": data["password"],
-            "database": data["database"],
-            "table":    data["table"],
-            "limit":    data["limit"],
-        },
+        arguments=req.model_dump(exclude={"space", "title"}),
         read_timeout_seconds=timedelta(seconds=600)
     )
     raw = res.content[0].text
 
-    # 2️⃣ parse into Python list
+    # 2️⃣ parse into Python list (orjson.JSONDecodeError is a ValueError)
     try:
-        rows = json.loads(raw)
+        rows = orjson.loads(raw)
     except ValueError:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": "Invalid JSON from tool", "raw": raw}
         )
 
+    # Nothing described means nothing to write; skip the Confluence round-trip
+    if not rows:
+        return ORJSONResponse({"descriptions": [], "confluence_update": None})
+
     # 3️⃣ now call your new Confluence‐updater tool
-    update_res = await _mcp_session.call_tool(
-        "sync_confluence_table_delta",
-        arguments={
-            "space": data["space"],
-            "title": data["title"],
-            "data":  rows
-        },
-        # give Confluence plenty of time to accept & version-bump
-        read_timeout_seconds=timedelta(seconds=300)
-    )
+    try:
+        update_res = await _call_tool(
+            "sync_confluence_table_delta",
+            arguments={
+                "space": req.space,
+                "title": req.title,
+                "data":  rows
+            },
+            # give Confluence plenty of time to accept & version-bump
+            read_timeout_seconds=timedelta(seconds=300)
+        )
+    finally:
+        # The page may have changed even if the call failed part-way
+        invalidate_delta_cache(req.space, req.title)
     # unwrap its JSON, which is the Confluence response
     updated_page = update_res.content[0].json()
 
     # 4️⃣ return both the describe rows and the Confluence update
-    return JSONResponse({
+    return ORJSONResponse({
         "descriptions": rows,
         "confluence_update": updated_page
     })
 
 @app.get("/describe-all-columns", response_class=HTMLResponse)
 async def describe_all_ui(request: Request):
-    return templates.TemplateResponse("describe_table_columns.html", {"request": request})
+    return _static_page("describe_table_columns.html")
 
 
 @app.get("/test-update-confluence")
@@ -1230,76 +1433,70 @@ async def test_update_confluence():
 
     try:
         # 2) Invoke the MCP tool (allow a bit of time for Confluence)
-        res = await _mcp_session.call_tool(
-            "update_confluence_table",
-            arguments=test_args,
-            read_timeout_seconds=timedelta(seconds=120)
-        )
+        try:
+            res = await _call_tool(
+                "update_confluence_table",
+                arguments=test_args,
+                read_timeout_seconds=timedelta(seconds=120)
+            )
+        finally:
+            invalidate_delta_cache(test_args["space"], test_args["title"])
         # 3) Unwrap the JSON response from the tool
         updated = res.content[0].json()
 
         # 4) Return it directly so you can inspect version bump, etc.
-        return JSONResponse(status_code=200, content=updated)
+        return ORJSONResponse(status_code=200, content=updated)
 
     except Exception as e:
         # If anything goes wrong, return the error details
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=_short_error(e))
 
 @app.get("/sync-all-tables", response_class=HTMLResponse)
 async def sync_ui(request: Request):
     """
     Renders the modern Tailwind-based UI for triggering and monitoring sync.
     """
-    return templates.TemplateResponse("sync_tables.html", {"request": request})
+    return _static_page("sync_tables.html")
 
 
-def parse_sql_keys(sql_text: str, only_new: bool = False) -> List[str]:
-    """
-    Extract column names from a CREATE TABLE (…) block and
-    return them as 'TableName.ColumnName', inferring TableName
-    from the CREATE TABLE header in the SQL.
-    """
-    # 1) Find the table name
-    table_match = re.search(
-        r'CREATE\s+TABLE\s+\[?[A-Za-z0-9_]+\]?\.\[?([A-Za-z0-9_]+)\]?', 
-        sql_text, 
-        re.IGNORECASE
-    )
-    if not table_match:
-        raise ValueError("Could not find CREATE TABLE statement with a table name")
-    table_name = table_match.group(1)
-    
-    # 2) Now extract columns
-    keys: List[str] = []
-    in_columns = False
+# Max concurrent get_bitbucket_file_raw calls per PR webhook
+_PR_FETCH_CONCURRENCY = 8
 
-    for raw_line in sql_text.splitlines():
-        line = raw_line.strip()
-        
-        # Detect start of the column definitions
-        if line.upper().startswith("CREATE TABLE"):
-            in_columns = True
-            continue
-        if not in_columns:
-            continue
-        
-        # Stop at the closing parenthesis
-        if line.startswith(")"):
-            break
-        
-        # Match "[ColumnName] ..." lines
-        col_match = re.match(r'^\[([^\]]+)\]\s', line)
-        if col_match:
-            col = col_match.group(1)
-            keys.append(f"{table_name}.{col}")
+# Coalescing of sync_confluence_table_delta calls from concurrent PR webhooks.
+# Submissions for the same (space, title) arriving within the window are merged
+# into one MCP call; a batch is flushed early once it holds _DELTA_BATCH_MAX_KEYS.
+_DELTA_BATCH_WINDOW = 0.05
+_DELTA_BATCH_MAX_KEYS = 64
+
+
+async def _sync_confluence_delta(space: str, title: str, keys: List[str]) -> Dict[str, Any]:
+    """One sync_confluence_table_delta call for a merged batch of keys."""
+    try:
+        res = await _call_tool(
+            "sync_confluence_table_delta",
+            arguments={"space": space, "title": title, "data": [{"column": k, "description": ""} for k in keys]}
+        )
+    finally:
+        invalidate_delta_cache(space, title)
+    return orjson.loads(res.content[0].text)
+
+
+_delta_batcher = DeltaBatcher(_sync_confluence_delta, window=_DELTA_BATCH_WINDOW, max_keys=_DELTA_BATCH_MAX_KEYS)
+
+
+async def _sync_confluence_delta_batched(space: str, title: str, keys: List[str]) -> Dict[str, Any]:
+    """Queue keys for a coalesced sync_confluence_table_delta call and wait for this caller's share."""
+    return await _delta_batcher.submit(space, title, keys)
 
-    return keys
 
 @app.post("/pr-sync")
 async def on_pr_event(request: Request):
+    # Resolve the level once; the payload/file dumps below are skipped entirely at INFO
+    debug = logger.isEnabledFor(logging.DEBUG)
     logger.debug("[on_pr_event] endpoint called")
-    body = await request.json()
-    logger.debug("[on_pr_event] payload: %s", body)
+    body = orjson.loads(await request.body())
+    if debug:
+        logger.debug("[on_pr_event] payload: %s", body)
     required = ["project","repo","pr_id","branch","author","path_prefix","space","title"]
     for field in required:
         if field not in body:
@@ -1322,34 +1519,53 @@ async def on_pr_event(request: Request):
 
     # Step 1: Get changed SQL files
     logger.debug("[on_pr_event] calling list_pr_changed_files tool")
-    res = await _mcp_session.call_tool(
+    res = await _call_tool(
         "list_pr_changed_files",
         arguments={"project": project, "repo": repo, "pr_id": pr_id, "path_prefix": path_prefix}
     )
-    changes = json.loads(res.content[0].text).get("files", [])
-    logger.debug("[on_pr_event] changes from tool: %s", changes)
+    changes = orjson.loads(res.content[0].text).get("files", [])
+    if debug:
+        logger.debug("[on_pr_event] changes from tool: %s", changes)
 
     # Step 2: Parse new keys
-    new_keys = []
-    for c in changes:
-        logger.debug("[on_pr_event] processing file: %s type:%s", c["path"], c["type"])
-        raw_res = await _mcp_session.call_tool(
-            "get_bitbucket_file_raw",
-            arguments={"project": project, "repo": repo, "path": c["path"], "at_ref": branch}
-        )
+    # Fetch all changed files concurrently, capped so a large PR can't flood the MCP server
+    fetch_slots = asyncio.Semaphore(_PR_FETCH_CONCURRENCY)
+
+    async def fetch_file(c):
+        if debug:
+            logger.debug("[on_pr_event] processing file: %s type:%s", c["path"], c["type"])
+        async with fetch_slots:
+            raw_res = await _call_tool(
+                "get_bitbucket_file_raw",
+                arguments={"project": project, "repo": repo, "path": c["path"], "at_ref": branch}
+            )
         text = raw_res.content[0].text
-        logger.debug("[on_pr_event] fetched file length=%d", len(text))
-        keys = parse_sql_keys(text, only_new=(c["type"] == "MODIFY"))
-        logger.debug("[on_pr_event] parsed keys: %s", keys)
-        new_keys.extend(keys)
+        if debug:
+            logger.debug("[on_pr_event] fetched file length=%d", len(text))
+        # MCP text content only arrives as str; encode once here so the parse
+        # workers receive (and scan) a compact byte buffer
+        return text.encode("utf-8"), c["type"] == "MODIFY"
+
+    jobs = await asyncio.gather(*[fetch_file(c) for c in changes])
+
+    # Regex parsing is CPU-bound; fan the files out across worker processes
+    loop = asyncio.get_running_loop()
+    parsed = await asyncio.gather(*[
+        loop.run_in_executor(_parse_pool, parse_sql_keys_bytes, sql_bytes, modify)
+        for sql_bytes, modify in jobs
+    ])
+    # Several scripts in one PR may touch the same table; an insertion-ordered
+    # dict drops repeats as they arrive and keeps Confluence row order stable
+    new_keys_dict: Dict[str, None] = {}
+    for keys in parsed:
+        if debug:
+            logger.debug("[on_pr_event] parsed keys: %s", keys)
+        new_keys_dict.update(dict.fromkeys(keys))
+    new_keys = list(new_keys_dict)
 
     # Step 3: Sync to Confluence
     logger.debug("[on_pr_event] syncing %d new keys to Confluence", len(new_keys))
-    result = await _mcp_session.call_tool(
-        "sync_confluence_table_delta",
-        arguments={"space": space, "title": title, "data": [{"column": k, "description": ""} for k in new_keys]}
-    )
-    result = json.loads(result.content[0].text)
+    result = await _sync_confluence_delta_batched(space, title, new_keys)
     # Step 4: Comment in Confluence
     if len(new_keys) > 0 and len(result["delta"]) > 0:
         new_columns = [entry["column"] for entry in result["delta"]]
@@ -1361,7 +1577,7 @@ async def on_pr_event(request: Request):
         comment = f"Hey @{author}, I’ve added {len(new_columns)} new key(s): {columns_list}. Please fill in descriptions!"
         
         logger.debug("[on_pr_event] posting comment: %s", comment)
-        await _mcp_session.call_tool(
+        await _call_tool(
             "post_confluence_comment",
             arguments={"space": space, "title": title, "comment": comment}
         )
@@ -1370,7 +1586,7 @@ async def on_pr_event(request: Request):
 
 
     logger.debug("[on_pr_event] completed, handled %d keys", len(new_keys))
-    return JSONResponse({"status": "ok", "handled": len(new_keys)})
+    return ORJSONResponse({"status": "ok", "handled": len(new_keys)})
 
 
 # ── Public root-level asset routes ───────────────────────────────────────────
@@ -1468,4 +1684,4 @@ async def spa_catch_all(request: Request, full_path: str):
     """
     # Always return the same React SPA entry point regardless of the requested path
     # The React Router will handle client-side routing based on the URL
-    return templates.TemplateResponse("ui.html", {"request": request})
+    return _static_page("ui.html")
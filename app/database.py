@@ -1,23 +1,13 @@
 import os
+import random
 import time
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, inspect, text, update
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import OperationalError
-from werkzeug.security import generate_password_hash, check_password_hash
 import datetime
 import logging
 
-# Import all models from the models module to ensure they are registered with SQLAlchemy.
-# Every model must be imported here so that Base.metadata.create_all() creates all tables
-# — including the SSO-related tables (SSOGroup, UserSession, user_group_association).
-from app.models import (
-    Base, User, DatabaseConnection, TestConfiguration, UserActivity,
-    TestExecution, DatabaseSession, SystemMetrics, RequestLog,
-    McpServerStatus, PageView, IdaMcpConnection, IdaMcpDeployAudit,
-    SSOGroup, UserSession, user_group_association, TabPermission,
-    MarketplaceItem, MarketplaceUsage,
-)
-
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -46,72 +36,139 @@ def init_db():
     5. Creates the sessionmaker `SessionLocal`.
     6. Ensures the default 'admin' user exists.
 
-    This function is called once at application startup.
+    This function is called once at application startup; repeat calls in the
+    same process are no-ops.
     """
     global engine, SessionLocal
+    if SessionLocal is not None:
+        return
     db_url = get_db_url()
-    engine = create_engine(db_url)
+    # Pool sized above SQLAlchemy's default 5+10 so request handlers, analytics
+    # writers and background threads don't queue for connections under load.
+    # pre_ping drops connections the server closed while idle; recycle keeps
+    # them under typical proxy/load-balancer idle timeouts.
+    engine = create_engine(
+        db_url,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "40")),
+        pool_pre_ping=True,
+        pool_recycle=300,
+        # Compiled-SQL LRU; sized above the default 500 since the routers issue
+        # several hundred distinct statements and evictions force recompiles.
+        query_cache_size=int(os.getenv("DB_QUERY_CACHE_SIZE", "1200")),
+    )
     
-    max_retries = 10
-    retry_delay = 5
-    for attempt in range(max_retries):
+    # Capped exponential backoff with jitter (0.25s doubling up to 4s) inside an
+    # overall deadline: a database that comes up quickly is picked up within a
+    # fraction of a second instead of on the next long sleep, and workers
+    # restarting together don't retry in lockstep.
+    connect_timeout = float(os.getenv("DB_CONNECT_TIMEOUT", "30"))
+    deadline = time.monotonic() + connect_timeout
+    retry_delay = 0.25
+    attempt = 0
+    while True:
+        attempt += 1
         try:
-            connection = engine.connect()
-            connection.close()
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
             logger.info("Database connection successful.")
             break
         except OperationalError as e:
-            logger.warning(f"Database connection failed. Attempt {attempt + 1} of {max_retries}. Retrying in {retry_delay} seconds...")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.error(f"Could not connect to the database within {connect_timeout:.0f} seconds. Exiting.")
+                exit(1)
+            sleep_for = min(retry_delay + random.uniform(0, retry_delay * 0.2), remaining)
+            logger.warning(f"Database connection failed (attempt {attempt}). Retrying in {sleep_for:.2f} seconds...")
             logger.error(f"Error: {e}")
-            time.sleep(retry_delay)
-    else:
-        logger.error("Could not connect to the database after multiple retries. Exiting.")
-        exit(1)
-
-    # This is the line that creates the tables.
-    # It checks for the existence of tables and creates any that are missing.
-    Base.metadata.create_all(engine)
-
-    # Inline schema migrations — add columns that were introduced after initial deployment.
-    # SQLAlchemy create_all does not ALTER existing tables, so we handle it manually here.
-    _run_schema_migrations(engine)
-    
+            time.sleep(sleep_for)
+            retry_delay = min(retry_delay * 2, 4)
+
+    # Several workers/pods can boot at once. Serialize the DDL + admin bootstrap
+    # behind a PostgreSQL advisory lock so only one runs it at a time; the
+    # others wait and then find everything already in place (all steps are
+    # idempotent), instead of racing on CREATE TABLE.
+    with engine.connect() as lock_conn:
+        lock_conn.execute(text("SELECT pg_advisory_lock(hashtext(:k))"), {"k": _BOOTSTRAP_LOCK_KEY})
+        try:
+            _bootstrap_schema(engine)
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(hashtext(:k))"), {"k": _BOOTSTRAP_LOCK_KEY})
+
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    
-    # Create admin user if it doesn't exist
-    session = SessionLocal()
-    try:
-        admin_user = session.query(User).filter_by(username='admin').first()
-        if not admin_user:
-            logger.info("Admin user not found, creating one.")
+
+
+_BOOTSTRAP_LOCK_KEY = "nova_nexus_bootstrap"
+
+
+def _bootstrap_schema(engine) -> None:
+    """Create missing tables, apply inline migrations and ensure the admin user."""
+    # Import all models here, not at module top, so that importing app.database
+    # (e.g. just for get_db_session) doesn't pull in every mapped class. Every
+    # model must be imported so that Base.metadata.create_all() creates all tables
+    # — including the SSO-related tables (SSOGroup, UserSession, user_group_association).
+    from app.models import (  # noqa: F401
+        Base, User, hash_password, DatabaseConnection, TestConfiguration, UserActivity,
+        TestExecution, DatabaseSession, SystemMetrics, RequestLog,
+        McpServerStatus, PageView, IdaMcpConnection, IdaMcpDeployAudit,
+        SSOGroup, UserSession, user_group_association, TabPermission,
+        MarketplaceItem, MarketplaceUsage,
+    )
+
+    # Everything below runs in a single transaction (PostgreSQL DDL is
+    # transactional), so a boot costs one COMMIT instead of one per step.
+    with engine.begin() as conn:
+        # This is the line that creates the tables.
+        # One catalog query lists the existing tables; create_all() only runs (with
+        # its per-table existence probes) when something is actually missing.
+        existing = set(inspect(conn).get_table_names())
+        missing = [t for name, t in Base.metadata.tables.items() if name not in existing]
+        if missing:
+            logger.info("Creating missing tables: %s", ", ".join(t.name for t in missing))
+            Base.metadata.create_all(conn, tables=missing)
+
+        # Inline schema migrations — add columns that were introduced after initial deployment.
+        # SQLAlchemy create_all does not ALTER existing tables, so we handle it manually here.
+        _run_schema_migrations(conn)
+
+        # Ensure the admin user exists and has admin privileges. The common case
+        # (admin already there) is a single UPDATE ... RETURNING, so restarts don't
+        # pay for hashing ADMIN_PASSWORD. Only when no row exists do we hash and
+        # upsert; ON CONFLICT covers a concurrent insert. An existing admin keeps
+        # its password, only is_admin is (re)asserted.
+        admin_id = conn.execute(
+            update(User)
+            .where(User.username == 'admin')
+            .values(is_admin=True)
+            .returning(User.id)
+        ).scalar_one_or_none()
+        if admin_id is None:
             admin_password = os.getenv('ADMIN_PASSWORD', 'admin')
-            admin_user = User(
-                username='admin',
-                email='admin@company.com',
-                full_name='System Administrator',
-                is_admin=True,
-                is_active=True
+            stmt = (
+                pg_insert(User)
+                .values(
+                    username='admin',
+                    email='admin@company.com',
+                    full_name='System Administrator',
+                    hashed_password=hash_password(admin_password),
+                    is_admin=True,
+                    is_active=True,
+                )
+                .on_conflict_do_update(index_elements=['username'], set_={'is_admin': True})
+                .returning(User.id)
             )
-            admin_user.set_password(admin_password)
-            session.add(admin_user)
-            session.commit()
-            logger.info("Admin user created.")
-        else:
-            # Update existing admin user to have admin privileges
-            if not getattr(admin_user, 'is_admin', False):
-                admin_user.is_admin = True
-                session.commit()
-                logger.info("Admin user updated with admin privileges.")
-            logger.info("Admin user already exists.")
-    finally:
-        session.close()
+            admin_id = conn.execute(stmt).scalar_one()
+    logger.info("Admin user ensured (id=%s).", admin_id)
+
 
-def _run_schema_migrations(engine) -> None:
+def _run_schema_migrations(conn) -> None:
     """
     Apply incremental DDL changes to existing databases.
 
     Each migration is idempotent: it checks for the column/index before
-    running ALTER TABLE so repeated restarts are safe.
+    running ALTER TABLE so repeated restarts are safe. Runs inside the
+    caller's transaction; each DDL statement gets its own SAVEPOINT so a
+    failing step is skipped without aborting the rest.
     """
     migrations = [
         # v1.x → tool_name column for granular MCP tool tracking via /api/marketplace/ping
@@ -135,23 +192,54 @@ def _run_schema_migrations(engine) -> None:
         ),
     ]
 
-    with engine.connect() as conn:
-        for table, column, ddl in migrations:
-            try:
-                # Check column existence via information_schema (works on PostgreSQL & SQLite)
-                result = conn.execute(
-                    text(
-                        "SELECT 1 FROM information_schema.columns "
-                        "WHERE table_name = :t AND column_name = :c"
-                    ),
-                    {"t": table, "c": column},
-                )
-                if result.fetchone() is None:
-                    conn.execute(text(ddl))
-                    conn.commit()
-                    logger.info("Schema migration applied: ADD COLUMN %s.%s", table, column)
-            except Exception as exc:
-                logger.warning("Schema migration skipped (%s.%s): %s", table, column, exc)
+    # Foreign-key indexes added after initial deployment. create_all() only
+    # builds indexes together with new tables, so existing databases get them
+    # here; names match SQLAlchemy's ix_<table>_<column> for index=True columns.
+    fk_indexes = [
+        ("test_executions", "test_config_id"),
+        ("test_executions", "user_id"),
+        ("marketplace_items", "owner_id"),
+        ("marketplace_usage", "user_id"),
+        ("marketplace_usage", "item_id"),
+    ]
+
+    # One catalog query each for the columns and indexes already present
+    existing_columns = set(
+        conn.execute(
+            text(
+                "SELECT table_name, column_name FROM information_schema.columns "
+                "WHERE table_name = ANY(:tables)"
+            ),
+            {"tables": sorted({t for t, _, _ in migrations})},
+        ).tuples()
+    )
+    existing_indexes = set(
+        conn.execute(
+            text("SELECT indexname FROM pg_indexes WHERE tablename = ANY(:tables)"),
+            {"tables": sorted({t for t, _ in fk_indexes})},
+        ).scalars()
+    )
+
+    for table, column, ddl in migrations:
+        if (table, column) in existing_columns:
+            continue
+        try:
+            with conn.begin_nested():
+                conn.execute(text(ddl))
+            logger.info("Schema migration applied: ADD COLUMN %s.%s", table, column)
+        except Exception as exc:
+            logger.warning("Schema migration skipped (%s.%s): %s", table, column, exc)
+
+    for table, column in fk_indexes:
+        name = f"ix_{table}_{column}"
+        if name in existing_indexes:
+            continue
+        try:
+            with conn.begin_nested():
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({column})"))
+            logger.info("Schema migration applied: CREATE INDEX %s", name)
+        except Exception as exc:
+            logger.warning("Schema migration skipped (index %s.%s): %s", table, column, exc)
 
 
 def get_db_session():
@@ -6,21 +6,94 @@ tracking performance metrics, error rates, and usage patterns with detailed
 line-by-line explanations of how each piece of data is captured and processed.
 """
 
+import functools   # lru_cache for the path -> activity categorization
+from collections import Counter  # Per-status request tallies between metric flushes
+import os          # For queue sizing overrides from the environment
+import re          # Precompiled matcher for paths excluded from analytics
+import queue       # Bounded hand-off between the request path and the writer thread
+import threading   # Background writer thread for analytics rows
 import time        # For precise timing measurements of request processing
+import zlib        # Stable crc32 for fallback page-view session IDs
 import logging     # For structured logging of middleware operations and errors
-from datetime import datetime, timedelta  # For timestamp handling and date calculations
-from typing import Callable  # For type hinting the next middleware function
-from fastapi import Request, Response  # FastAPI request/response objects
-from starlette.middleware.base import BaseHTTPMiddleware  # Base class for custom middleware
-from sqlalchemy.orm import Session  # Database session for analytics data storage
+from datetime import datetime, timedelta, timezone  # For timestamp handling and date calculations
+from typing import Optional  # For type hinting optional module state
+import orjson      # Pre-encoded JSON body for the middleware's error response
+from fastapi import Response  # Used to send the middleware's own 500 response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send  # Raw ASGI interface types
+from sqlalchemy import insert  # Multi-row INSERTs for batched analytics writes
+from sqlalchemy.exc import DataError, IntegrityError  # Row-level failures worth a per-event retry
+# Database module; SessionLocal is read at call time since init_db() sets it after import
+from app import database
 # Import database models for different types of analytics data
 from app.models import RequestLog, SystemMetrics, PageView, McpServerStatus, UserActivity
 
 # Create logger instance for this module (inherits from parent logger configuration)
 logger = logging.getLogger(__name__)
 
+# Analytics rows are written by a daemon thread so the request path only pays
+# for a queue put. The queue is bounded: if the writer falls behind, new events
+# are dropped (and counted) rather than growing memory or blocking requests.
+_ANALYTICS_QUEUE_SIZE = int(os.getenv("ANALYTICS_QUEUE_SIZE", "10000"))
+_ANALYTICS_BATCH_SIZE = 500
+_analytics_queue: "queue.Queue[tuple[str, dict]]" = queue.Queue(maxsize=_ANALYTICS_QUEUE_SIZE)
+_dropped_events = 0
+_writer_thread: Optional[threading.Thread] = None
+# Middleware instance whose _writer_loop runs the writer; lets start_writer() restart it
+_writer_owner: Optional["AnalyticsMiddleware"] = None
+_writer_lock = threading.Lock()
+# Queued by stop_writer(): the writer drains everything ahead of it, then exits
+_STOP_WRITER = object()
 
-class AnalyticsMiddleware(BaseHTTPMiddleware):
+# Request metrics (response time, request/error counts) are aggregated by the
+# writer thread and flushed as a handful of SystemMetrics rows per interval,
+# instead of two or three rows for every single request.
+_METRICS_FLUSH_INTERVAL = float(os.getenv("ANALYTICS_METRICS_FLUSH_INTERVAL", "10"))
+
+# Shared (read-only) tag dicts for the usual status codes, so metric rows reuse
+# one object per code instead of building a fresh dict for every row.
+_STATUS_TAGS = {
+    code: {'status_code': code}
+    for code in (200, 201, 204, 301, 302, 304, 400, 401, 403, 404, 409, 422, 429, 500, 502, 503, 504)
+}
+
+# The 500 body is static, so encode it once instead of on every failed request
+_ERROR_500_BODY = orjson.dumps({"detail": "Internal server error"})
+
+# Paths never worth an analytics row: static assets, icons and the liveness
+# probe. __call__() hands these straight to the app without any bookkeeping.
+_SKIP_PATH_RE = re.compile(r'/static/|/favicon\.|/logo\.|/health$')
+
+# Human-readable titles for the main frontend pages (recorded on page views)
+_TITLE_MAP = {
+    'bi': 'Business Intelligence',
+    'analytics': 'Analytics Dashboard',
+    'devops': 'DevOps Tools',
+    'tests': 'Testing Suite',
+    'users': 'User Management',
+    'settings': 'Settings',
+    'login': 'Login Page',
+    'home': 'Home Dashboard'
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def _page_title_for(path: str) -> str:
+    """Path -> page title; memoized since the same few pages are viewed repeatedly."""
+    if path == '/':
+        return 'Home'
+    
+    # Remove leading slash and convert to title
+    clean_path = path.lstrip('/')
+    
+    if clean_path in _TITLE_MAP:
+        return _TITLE_MAP[clean_path]
+    
+    # Default: capitalize and replace hyphens/underscores
+    parts = clean_path.replace('-', ' ').replace('_', ' ').split('/')
+    return ' '.join(word.capitalize() for word in parts if word)
+
+
+class AnalyticsMiddleware:
     """
     Middleware to log requests and track system metrics for analytics.
     
@@ -29,9 +102,168 @@ class AnalyticsMiddleware(BaseHTTPMiddleware):
     - Tracks response times and status codes
     - Records client information for analytics
     - Updates system metrics in real-time
+
+    It is a plain ASGI middleware: it only observes the scope and the
+    ``http.response.start`` message, so request and response bodies stream
+    through untouched (no BaseHTTPMiddleware task or memory streams).
     """
+
+    def __init__(self, app: ASGIApp):
+        global _writer_owner
+        self.app = app
+        _writer_owner = self
+        self._start_writer()
+
+    def _start_writer(self) -> None:
+        """Start the process-wide analytics writer thread (once)."""
+        global _writer_thread
+        with _writer_lock:
+            if _writer_thread is None or not _writer_thread.is_alive():
+                _writer_thread = threading.Thread(
+                    target=self._writer_loop,
+                    daemon=True,
+                    name="analytics-writer",
+                )
+                _writer_thread.start()
+
+    def _writer_loop(self) -> None:
+        """Daemon thread: drain queued analytics events and write them to the database."""
+        logger.info("Analytics writer thread started.")
+        # Metric aggregates are only touched by this thread, so no locking is needed
+        status_counts: Counter = Counter()
+        timing = [0, 0, 0]  # total ms, samples, max ms
+        next_flush = time.monotonic() + _METRICS_FLUSH_INTERVAL
+        stopping = False
+        while not stopping:
+            # Wait for the first event (or the next metrics flush), then take whatever else is queued
+            batch = []
+            try:
+                item = _analytics_queue.get(timeout=max(0.0, next_flush - time.monotonic()))
+                if item is _STOP_WRITER:
+                    stopping = True
+                else:
+                    batch.append(item)
+            except queue.Empty:
+                pass
+            while batch and len(batch) < _ANALYTICS_BATCH_SIZE:
+                try:
+                    item = _analytics_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP_WRITER:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            for kind, data in batch:
+                if kind == "request":
+                    response_time_ms = data['response_time_ms']
+                    status_counts[data['status_code']] += 1
+                    timing[0] += response_time_ms
+                    timing[1] += 1
+                    timing[2] = max(timing[2], response_time_ms)
+
+            metric_rows = []
+            # Flush on schedule, and once more on stop so the last interval isn't lost
+            if stopping or time.monotonic() >= next_flush:
+                metric_rows = self._system_metric_rows(status_counts, timing, datetime.now(timezone.utc))
+                status_counts.clear()
+                timing[:] = [0, 0, 0]
+                next_flush = time.monotonic() + _METRICS_FLUSH_INTERVAL
+
+            if not batch and not metric_rows:
+                continue
+            try:
+                self._write_batch(batch, metric_rows)
+            except Exception as e:
+                logger.error(f"Failed to write analytics batch: {e}")
+        logger.info("Analytics writer thread stopped.")
+
+    def _write_batch(self, batch: list, metric_rows: Optional[list] = None) -> None:
+        """
+        Write a batch of queued (kind, data) analytics events, plus any flushed
+        aggregate metric rows, in one transaction.
+
+        Rows are grouped per table and sent as multi-row INSERTs (no ORM objects
+        or unit-of-work bookkeeping), so a burst of N requests costs four
+        statements and a single COMMIT instead of N transactions.
+        """
+        if database.SessionLocal is None:
+            logger.warning("SessionLocal not initialized, skipping analytics batch")
+            return
+
+        metric_rows = metric_rows or []
+        request_rows, page_view_rows, activity_rows = [], [], []
+        for kind, data in batch:
+            if kind == "request":
+                request_rows.append(data)
+            elif kind == "page_view":
+                data['title'] = _page_title_for(data['path'])
+                page_view_rows.append(data)
+            elif kind == "activity":
+                # Determine activity type and action based on path
+                activity_type, action = self._get_activity_info(data['path'], data['method'])
+                activity_rows.append({
+                    'user_id': data['user_id'],  # Can be None for anonymous users
+                    'activity_type': activity_type,
+                    'action': action,
+                    'status': 'success',  # We only track successful activities here
+                    'ip_address': data['ip_address'],
+                    'timestamp': data['timestamp'],
+                })
+
+        retry_individually = False
+        db = database.SessionLocal()
+        try:
+            for model, rows in (
+                (RequestLog, request_rows),
+                (SystemMetrics, metric_rows),
+                (PageView, page_view_rows),
+                (UserActivity, activity_rows),
+            ):
+                if rows:
+                    db.execute(insert(model), rows)
+            db.commit()
+            logger.debug(
+                f"Wrote analytics batch: {len(request_rows)} requests, {len(page_view_rows)} page views, "
+                f"{len(activity_rows)} activities"
+            )
+        except (IntegrityError, DataError) as e:
+            db.rollback()
+            if len(batch) + bool(metric_rows) > 1:
+                # One bad row (e.g. a stale user_id) must not cost the whole batch
+                logger.warning(
+                    f"Analytics batch insert failed ({type(e).__name__}); retrying {len(batch)} events individually"
+                )
+                retry_individually = True
+            else:
+                logger.error(f"Failed to write analytics event: {e}")
+        except Exception as e:
+            # Connection or server trouble affects every row alike; retrying each
+            # event in its own session would only multiply connection attempts
+            db.rollback()
+            logger.error(f"Failed to write analytics batch, dropping {len(batch)} events: {type(e).__name__}: {e}")
+        finally:
+            db.close()
+
+        if retry_individually:
+            for event in batch:
+                self._write_batch([event])
+            if metric_rows:
+                self._write_batch([], metric_rows)
+
+    @staticmethod
+    def _enqueue(kind: str, data: dict) -> None:
+        """Hand an analytics event to the writer thread without blocking."""
+        global _dropped_events
+        try:
+            _analytics_queue.put_nowait((kind, data))
+        except queue.Full:
+            _dropped_events += 1
+            if _dropped_events % 1000 == 1:
+                logger.warning(f"Analytics queue full, dropped {_dropped_events} events so far")
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process HTTP request and collect comprehensive analytics data.
         
@@ -41,7 +273,7 @@ class AnalyticsMiddleware(BaseHTTPMiddleware):
         2. **Performance Monitoring**: Measures response times and request sizes
         3. **User Tracking**: Identifies authenticated users via JWT tokens
         4. **Error Monitoring**: Captures and logs any exceptions or errors
-        5. **Database Logging**: Asynchronously stores analytics data
+        5. **Database Logging**: Queues analytics data for the background writer thread
         6. **Activity Tracking**: Records user actions for audit and analytics
         
         **Data Collected**:
@@ -73,66 +305,90 @@ class AnalyticsMiddleware(BaseHTTPMiddleware):
         - IP addresses collected for security monitoring
         - User consent assumed for legitimate business analytics
         
-        The middleware operates asynchronously to avoid impacting request performance.
+        Database writes happen on the analytics writer thread; the request path
+        only enqueues an event, so it never waits on the database.
         """
-        # Record the exact time when request processing begins (high precision)
-        start_time = time.time()
-        
-        # Extract client information from HTTP headers for analytics and security
-        client_ip = self._get_client_ip(request)           # Get real client IP (handles proxies)
-        user_agent = request.headers.get('User-Agent', '') # Browser/client identification string
-        referer = request.headers.get('Referer', '')       # Previous page URL (for navigation tracking)
+        # Non-HTTP traffic (websockets, lifespan) and untracked paths (static files,
+        # icons, health probe) skip analytics entirely
+        if scope['type'] != 'http' or _SKIP_PATH_RE.match(scope['path']):
+            await self.app(scope, receive, send)
+            return
+        path = scope['path']
+        method = scope['method']
+
+        # Record when request processing begins (monotonic, immune to clock adjustments)
+        start_ns = time.perf_counter_ns()
+        
+        # Extract client information from HTTP headers for analytics and security.
+        # One pass over the raw ASGI headers (already lower-cased bytes) instead of
+        # a case-insensitive scan per lookup; reversed so the first value wins,
+        # as with request.headers.get().
+        headers = dict(reversed(scope['headers']))
+        client_ip = self._get_client_ip(scope, headers)                    # Get real client IP (handles proxies)
+        user_agent = headers.get(b'user-agent', b'').decode('latin-1')  # Browser/client identification string
+        referer = headers.get(b'referer', b'').decode('latin-1')        # Previous page URL (for navigation tracking)
         
         # Determine request payload size for bandwidth analytics
-        request_size = None  # Initialize as None (unknown size)
-        content_length = request.headers.get('Content-Length')  # HTTP header with payload size
-        if content_length:
-            try:
-                request_size = int(content_length)  # Convert string header to integer bytes
-            except ValueError:
-                pass  # If conversion fails, leave as None (malformed header)
+        # (None when the header is missing or malformed)
+        content_length = headers.get(b'content-length')  # HTTP header with payload size
+        request_size = int(content_length) if content_length and content_length.isdigit() else None
         
         # Initialize response variables before processing request
-        response = None      # Will hold the HTTP response object
-        error_message = None # Will capture any error that occurs during processing
-        
+        response_start: dict = {}  # Status and headers from the http.response.start message
+        error_message = None       # Will capture any error that occurs during processing
+        pending_error = None       # Exception to re-raise once the request has been recorded
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                response_start['status'] = message['status']
+                response_start['headers'] = message.get('headers', ())
+            await send(message)
+
         try:
             # Call the next middleware or route handler in the chain
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
             # If any error occurs during request processing, capture it for analytics
             error_str = str(e) if not isinstance(e, Exception) else repr(e)  # Safe error conversion
             logger.error(f"Request failed: {error_str}")  # Log error for debugging
             error_message = error_str  # Store error message for database logging
-            # Create standardized error response for client
-            from fastapi.responses import JSONResponse
-            response = JSONResponse(
-                status_code=500,  # Internal Server Error status
-                content={"detail": "Internal server error"}  # Generic error message
-            )
+            if response_start:
+                # Headers are already sent, so the error cannot be turned into a clean
+                # 500; record the request, then let the server abort the response
+                pending_error = e
+            else:
+                # Create standardized error response for client
+                response = Response(
+                    content=_ERROR_500_BODY,         # Generic error message, pre-encoded
+                    status_code=500,                 # Internal Server Error status
+                    media_type="application/json",
+                )
+                await response(scope, receive, send_wrapper)
+        status_code = response_start.get('status', 500)
         
         # Calculate performance metrics after request completion
-        end_time = time.time()  # Record exact completion time
-        response_time_ms = int((end_time - start_time) * 1000)  # Convert to milliseconds for precision
+        response_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000  # Elapsed nanoseconds -> milliseconds
+        # One timestamp shared by every analytics row for this request (the request
+        # time, not the later write time)
+        now = datetime.now(timezone.utc)
         
         # Determine response payload size for bandwidth analytics
-        response_size = None  # Initialize as None (unknown size)
-        if hasattr(response, 'headers') and response.headers.get('Content-Length'):
-            try:
-                response_size = int(response.headers['Content-Length'])  # Convert header to integer bytes
-            except ValueError:
-                pass
+        response_length = dict(response_start.get('headers', ())).get(b'content-length')
+        response_size = int(response_length) if response_length and response_length.isdigit() else None
         
         # Get user ID if authenticated
         user_id = None
         try:
-            # First try to extract user ID from the request state (FastAPI dependency injection)
-            if hasattr(request.state, 'current_user') and request.state.current_user:
-                user_id = request.state.current_user.id
+            # First try to extract user ID from the request state (FastAPI dependency injection).
+            # request.state is backed by scope["state"], which downstream handlers
+            # have filled in by now; a plain dict lookup avoids State.__getattr__.
+            current_user = scope.get('state', {}).get('current_user')
+            if current_user:
+                user_id = current_user.id
                 logger.debug(f"Analytics middleware found user_id from request.state: {user_id}")
             else:
                 # Try to extract user ID from JWT token in Authorization header
-                user_id = self._extract_user_from_token(request)
+                user_id = self._extract_user_from_token(headers)
                 if user_id:
                     logger.debug(f"Analytics middleware found user_id from JWT token: {user_id}")
                 # No logging for anonymous requests to reduce log noise
@@ -141,11 +397,13 @@ class AnalyticsMiddleware(BaseHTTPMiddleware):
             logger.debug(f"Analytics middleware: Error getting user: {e}")
             pass  # Anonymous request
         
-        # Log the request asynchronously to avoid blocking
+        is_api = path.startswith('/api/')
+
+        # Queue the request log for the writer thread (never blocks on the DB)
         self._log_request_async(
-            method=request.method,
-            path=str(request.url.path),
-            status_code=response.status_code,
+            method=method,
+            path=path,
+            status_code=status_code,
             response_time_ms=response_time_ms,
             request_size=request_size,
             response_size=response_size,
@@ -153,38 +411,43 @@ class AnalyticsMiddleware(BaseHTTPMiddleware):
             user_agent=user_agent,
             referer=referer,
             user_id=user_id,
-            error_message=error_message
+            error_message=error_message,
+            timestamp=now
         )
         
         # Also track page views for successful GET requests (frontend pages only)
-        if (request.method == "GET" and response.status_code == 200 and 
-            not str(request.url.path).startswith('/api/') and 
-            str(request.url.path) != '/favicon.ico'):
+        if (method == "GET" and status_code == 200 and
+            not is_api):
             self._track_page_view_async(
-                path=str(request.url.path),
+                path=path,
                 ip_address=client_ip,
                 user_agent=user_agent,
                 referer=referer,
-                user_id=user_id
+                user_id=user_id,
+                session_id=self._get_session_id(headers, client_ip, user_agent),
+                load_time_ms=response_time_ms,
+                timestamp=now
             )
         
         # Track user activities for API endpoints
-        if str(request.url.path).startswith('/api/') and response.status_code < 400:
-            logger.debug(f"Analytics middleware tracking activity for {request.url.path} with user_id: {user_id or 'anonymous'}")
+        if is_api and status_code < 400:
+            logger.debug(f"Analytics middleware tracking activity for {path} with user_id: {user_id or 'anonymous'}")
             self._track_user_activity_async(
-                path=str(request.url.path),
-                method=request.method,
+                path=path,
+                method=method,
                 user_id=user_id,
-                ip_address=client_ip
+                ip_address=client_ip,
+                timestamp=now
             )
-        
-        return response
+
+        if pending_error is not None:
+            raise pending_error
     
-    def _extract_user_from_token(self, request: Request) -> int:
+    def _extract_user_from_token(self, headers: dict) -> int:
         """Try to extract user ID from JWT token in Authorization header."""
         try:
             # Get Authorization header
-            auth_header = request.headers.get('Authorization')
+            auth_header = headers.get(b'authorization', b'').decode('latin-1')
             if not auth_header or not auth_header.startswith('Bearer '):
                 return None
             
@@ -213,127 +476,49 @@ class AnalyticsMiddleware(BaseHTTPMiddleware):
             logger.debug(f"Could not extract user from token: {e}")
             return None
     
-    def _get_client_ip(self, request: Request) -> str:
+    def _get_client_ip(self, scope: Scope, headers: dict) -> str:
         """Extract client IP address from request."""
         # Check for forwarded IP first
-        forwarded = request.headers.get('X-Forwarded-For')
+        forwarded = headers.get(b'x-forwarded-for')
         if forwarded:
-            return forwarded.split(',')[0].strip()
+            return forwarded.decode('latin-1').split(',')[0].strip()
         
         # Check for real IP
-        real_ip = request.headers.get('X-Real-IP')
+        real_ip = headers.get(b'x-real-ip')
         if real_ip:
-            return real_ip
+            return real_ip.decode('latin-1')
         
         # Fallback to client host
-        if request.client:
-            return request.client.host
+        client = scope.get('client')
+        if client:
+            return client[0]
         
         return 'unknown'
     
+    @staticmethod
+    def _get_session_id(headers: dict, client_ip: str, user_agent: str) -> str:
+        """Session ID from the X-Session-ID header, else derived from IP + User-Agent."""
+        session_id = headers.get(b'x-session-id')
+        if session_id:
+            return session_id.decode('latin-1')
+        # crc32 is stable across restarts (str hash() is randomized per process) and runs in C
+        return f"{zlib.crc32(f'{client_ip}|{user_agent}'.encode('utf-8', 'ignore')):08x}"
+
     def _log_request_async(self, **kwargs):
-        """Log request data to database asynchronously."""
-        try:
-            # Import SessionLocal dynamically to avoid import-time issues
-            from app.database import SessionLocal
-            
-            # Check if SessionLocal is properly initialized
-            if SessionLocal is None:
-                logger.warning("SessionLocal not initialized, skipping request logging")
-                return
-            
-            # Create a new database session for logging
-            db = SessionLocal()
-            try:
-                # Create request log entry
-                request_log = RequestLog(**kwargs)
-                db.add(request_log)
-                
-                # Update system metrics
-                self._update_system_metrics(db, kwargs['response_time_ms'], kwargs['status_code'])
-                
-                db.commit()
-            except Exception as e:
-                logger.error(f"Failed to log request: {e}")
-                db.rollback()
-            finally:
-                db.close()
-        except Exception as e:
-            logger.error(f"Failed to create database session for logging: {e}")
-    
-    def _track_page_view_async(self, path: str, ip_address: str, user_agent: str, referer: str, user_id: int = None):
-        """Track page view data to database asynchronously."""
-        try:
-            # Import SessionLocal dynamically to avoid import-time issues
-            from app.database import SessionLocal
-            
-            # Check if SessionLocal is properly initialized
-            if SessionLocal is None:
-                logger.warning("SessionLocal not initialized, skipping page view tracking")
-                return
-            
-            # Create a new database session for logging
-            db = SessionLocal()
-            try:
-                # Create page view entry
-                page_view = PageView(
-                    path=path,
-                    ip_address=ip_address,
-                    user_agent=user_agent,
-                    referer=referer,
-                    user_id=user_id,
-                    timestamp=datetime.utcnow()
-                )
-                db.add(page_view)
-                db.commit()
-            except Exception as e:
-                logger.error(f"Failed to track page view: {e}")
-                db.rollback()
-            finally:
-                db.close()
-        except Exception as e:
-            logger.error(f"Failed to create database session for page view tracking: {e}")
-    
-    def _track_user_activity_async(self, path: str, method: str, user_id: int = None, ip_address: str = None):
-        """Track user activity data to database asynchronously."""
-        try:
-            logger.debug(f"Tracking user activity: path={path}, method={method}, user_id={user_id or 'anonymous'}")
-            
-            # Import SessionLocal dynamically to avoid import-time issues
-            from app.database import SessionLocal
-            
-            # Check if SessionLocal is properly initialized
-            if SessionLocal is None:
-                logger.warning("SessionLocal not initialized, skipping user activity tracking")
-                return
-            
-            # Create a new database session for logging
-            db = SessionLocal()
-            try:
-                # Determine activity type and action based on path
-                activity_type, action = self._get_activity_info(path, method)
-                
-                # Create user activity entry (user_id can be None for anonymous activities)
-                user_activity = UserActivity(
-                    user_id=user_id,  # Can be None for anonymous users
-                    activity_type=activity_type,
-                    action=action,
-                    status='success',  # We only track successful activities here
-                    ip_address=ip_address,
-                    timestamp=datetime.utcnow()
-                )
-                db.add(user_activity)
-                db.commit()
-                logger.debug(f"Successfully tracked user activity: {activity_type} - {action} (user_id: {user_id or 'anonymous'})")
-            except Exception as e:
-                logger.error(f"Failed to track user activity: {e}")
-                db.rollback()
-            finally:
-                db.close()
-        except Exception as e:
-            logger.error(f"Failed to create database session for user activity tracking: {e}")
-    
-    def _get_activity_info(self, path: str, method: str) -> tuple[str, str]:
+        """Queue request data for the analytics writer thread."""
+        self._enqueue("request", kwargs)
+
+    def _track_page_view_async(self, **kwargs):
+        """Queue page view data for the analytics writer thread."""
+        self._enqueue("page_view", kwargs)
+
+    def _track_user_activity_async(self, **kwargs):
+        """Queue user activity data for the analytics writer thread."""
+        self._enqueue("activity", kwargs)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _get_activity_info(path: str, method: str) -> tuple[str, str]:
         """
         Categorize API requests into meaningful activity types and actions.
         
@@ -367,6 +552,9 @@ class AnalyticsMiddleware(BaseHTTPMiddleware):
         - User journey analysis
         - Security monitoring for sensitive operations
         - Feature adoption tracking
+
+        Results are memoized per (path, method): the same endpoints are hit
+        over and over, so repeat lookups skip the substring cascade below.
         """
         # Map API paths to activity types and actions
         if '/auth/' in path:
@@ -420,49 +608,86 @@ class AnalyticsMiddleware(BaseHTTPMiddleware):
         else:
             return 'api', f'{method} {path.replace("/api/", "")}'
     
-    def _update_system_metrics(self, db: Session, response_time_ms: int, status_code: int):
-        """Update real-time system metrics."""
-        try:
-            now = datetime.utcnow()
-            
-            # Log response time metric
-            response_time_metric = SystemMetrics(
-                metric_name='response_time',
-                metric_type='gauge',
-                value=f'{response_time_ms}ms',
-                numeric_value=response_time_ms,
-                source='request_middleware',
-                timestamp=now
-            )
-            db.add(response_time_metric)
-            
-            # Log request count metric
-            request_count_metric = SystemMetrics(
-                metric_name='request_count',
-                metric_type='counter',
-                value='1',
-                numeric_value=1,
-                source='request_middleware',
-                tags={'status_code': status_code},
-                timestamp=now
-            )
-            db.add(request_count_metric)
-            
-            # Log error metric if applicable
+    @staticmethod
+    def _system_metric_rows(status_counts: Counter, timing: list, now: datetime) -> list[dict]:
+        """Build the system metric rows for one flush interval of aggregated requests."""
+        total_ms, samples, max_ms = timing
+        if not samples:
+            return []
+        avg_ms = round(total_ms / samples)
+        rows = [
+            # Response time metric (mean over the interval, max in tags)
+            {
+                'metric_name': 'response_time',
+                'metric_type': 'gauge',
+                'value': f'{avg_ms}ms',
+                'numeric_value': avg_ms,
+                'source': 'request_middleware',
+                'tags': {'samples': samples, 'max_ms': max_ms},
+                'timestamp': now,
+            },
+        ]
+        for status_code, count in status_counts.items():
+            tags = _STATUS_TAGS.get(status_code) or {'status_code': status_code}
+            # Request count metric
+            rows.append({
+                'metric_name': 'request_count',
+                'metric_type': 'counter',
+                'value': str(count),
+                'numeric_value': count,
+                'source': 'request_middleware',
+                'tags': tags,
+                'timestamp': now,
+            })
+            # Error metric if applicable
             if status_code >= 400:
-                error_metric = SystemMetrics(
-                    metric_name='error_count',
-                    metric_type='counter',
-                    value='1',
-                    numeric_value=1,
-                    source='request_middleware',
-                    tags={'status_code': status_code},
-                    timestamp=now
-                )
-                db.add(error_metric)
-        
-        except Exception as e:
-            logger.error(f"Failed to update system metrics: {e}")
+                rows.append({
+                    'metric_name': 'error_count',
+                    'metric_type': 'counter',
+                    'value': str(count),
+                    'numeric_value': count,
+                    'source': 'request_middleware',
+                    'tags': tags,
+                    'timestamp': now,
+                })
+        return rows
+
+def start_writer() -> None:
+    """
+    (Re)start the analytics writer thread if it isn't running.
+
+    The middleware starts it when the stack is built; call this from
+    application startup so a later lifespan in the same process (test
+    clients, reloads) restarts a writer that stop_writer() has shut down.
+    """
+    if _writer_owner is not None:
+        _writer_owner._start_writer()
+
+
+def stop_writer(timeout: float = 10.0) -> None:
+    """
+    Stop the analytics writer thread after it has written every queued event.
+
+    Blocks for up to ``timeout`` seconds; call it from application shutdown
+    (off the event loop) so pending rows are not lost with the daemon thread.
+    """
+    global _writer_thread
+    with _writer_lock:
+        thread = _writer_thread
+        if thread is None or not thread.is_alive():
+            return
+        deadline = time.monotonic() + timeout
+        try:
+            # Blocks only while the queue is full; the writer is draining it
+            _analytics_queue.put(_STOP_WRITER, timeout=timeout)
+        except queue.Full:
+            logger.warning("Analytics queue still full at shutdown; pending events may be lost")
+            return
+        thread.join(max(0.0, deadline - time.monotonic()))
+        if thread.is_alive():
+            logger.warning("Analytics writer did not finish draining before shutdown")
+        else:
+            _writer_thread = None
 
 
 def setup_analytics_middleware(app):
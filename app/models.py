@@ -13,10 +13,55 @@ from datetime import datetime
 from typing import Dict, Any, Optional, List
 import json
 import enum
-from werkzeug.security import generate_password_hash, check_password_hash
+import functools
+import os
 
 Base = declarative_base()
 
+# Password hashing cost. Unset keeps Werkzeug's default ("scrypt" /
+# "pbkdf2:sha256:<default iterations>" depending on version); set PWHASH_METHOD
+# and/or PWHASH_ITERS to trade login CPU time for hash strength. PWHASH_ITERS
+# only applies to pbkdf2 methods (alone it selects pbkdf2:sha256). Hashes store
+# their own parameters, so changing these never breaks existing logins.
+_PWHASH_METHOD = os.getenv("PWHASH_METHOD")
+_PWHASH_ITERS = os.getenv("PWHASH_ITERS")
+
+
+@functools.lru_cache(maxsize=1)
+def _pwhash_method() -> Optional[str]:
+    """Resolve the Werkzeug method string from PWHASH_METHOD / PWHASH_ITERS (None = default)."""
+    method = _PWHASH_METHOD
+    if not _PWHASH_ITERS:
+        return method
+    try:
+        iterations = int(_PWHASH_ITERS)
+    except ValueError:
+        iterations = 0
+    if iterations <= 0:
+        raise ValueError(f"PWHASH_ITERS must be a positive integer, got {_PWHASH_ITERS!r}")
+
+    parts = (method or "pbkdf2:sha256").split(":")
+    if parts[0] != "pbkdf2":
+        # scrypt and friends take no iteration count; the setting doesn't apply
+        return method
+    if len(parts) > 2:
+        raise ValueError(
+            f"PWHASH_METHOD {method!r} already sets pbkdf2 iterations; unset PWHASH_ITERS or drop them from the method"
+        )
+    hash_name = parts[1] if len(parts) == 2 else "sha256"
+    return f"pbkdf2:{hash_name}:{iterations}"
+
+
+def hash_password(password: str) -> str:
+    """Hash a password with the configured method; see PWHASH_METHOD / PWHASH_ITERS."""
+    # Imported on first use: only login and user-admin paths ever hash passwords
+    from werkzeug.security import generate_password_hash
+
+    method = _pwhash_method()
+    if method:
+        return generate_password_hash(password, method=method, salt_length=16)
+    return generate_password_hash(password)
+
 
 # ============================================================
 # SSO / Group Management — Association Tables
@@ -109,7 +154,10 @@ class User(Base):
     test_configurations = relationship("TestConfiguration", back_populates="user", cascade="all, delete-orphan")
     test_executions = relationship("TestExecution", back_populates="user", cascade="all, delete-orphan")
     user_activities = relationship("UserActivity", back_populates="user", cascade="all, delete")
-    groups = relationship("SSOGroup", secondary=user_group_association, back_populates="users")
+    # Groups are read by to_dict() and tab-permission checks for nearly every loaded
+    # user; selectin fetches them for a whole result set in one extra query instead
+    # of one lazy SELECT per user.
+    groups = relationship("SSOGroup", secondary=user_group_association, back_populates="users", lazy="selectin")
     sessions = relationship("UserSession", back_populates="user", cascade="all, delete-orphan")
     
     def __repr__(self):
@@ -117,10 +165,12 @@ class User(Base):
     
     def set_password(self, password: str) -> None:
         """Set the user's password by hashing it."""
-        self.hashed_password = generate_password_hash(password)
+        self.hashed_password = hash_password(password)
     
     def check_password(self, password: str) -> bool:
         """Check if the provided password matches the user's hashed password."""
+        from werkzeug.security import check_password_hash
+
         return check_password_hash(self.hashed_password, password)
     
     def to_dict(self) -> Dict[str, Any]:
@@ -344,8 +394,8 @@ class TestExecution(Base):
     __tablename__ = "test_executions"
     
     id = Column(Integer, primary_key=True, index=True)
-    test_config_id = Column(Integer, ForeignKey("test_configurations.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    test_config_id = Column(Integer, ForeignKey("test_configurations.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     execution_data = Column(JSON, nullable=False)  # Input data used for execution
     result = Column(JSON, nullable=False)  # Execution result/response
     status = Column(String(50), nullable=False)  # success, failure, error
@@ -977,7 +1027,7 @@ class MarketplaceItem(Base):
     item_type = Column(String(50), nullable=False)  # 'agent' or 'mcp_server'
     
     # Owner
-    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Stored as a base64 data URI (data:image/png;base64,...) or plain URL
     icon = Column(Text, nullable=True)
@@ -1056,10 +1106,10 @@ class MarketplaceUsage(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     # Nullable so the public /ping endpoint can log calls without a portal user account
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     # Free-text identifier supplied by the caller when user_id is unknown
     user_identifier = Column(String(255), nullable=True)
-    item_id = Column(Integer, ForeignKey("marketplace_items.id", ondelete="CASCADE"), nullable=False)
+    item_id = Column(Integer, ForeignKey("marketplace_items.id", ondelete="CASCADE"), nullable=False, index=True)
     action = Column(String(50), nullable=False)  # 'call', 'deploy', 'install'
     # For MCP servers: the specific tool that was invoked (e.g. "search_jira", "create_ticket")
     tool_name = Column(String(255), nullable=True)
@@ -111,3 +111,30 @@ Notes
 - Do **not** wrap the final answer in code fences or add commentary.
 
 """
+
+# ---------------------------------------------------------------------------
+# Pre-split renderers for the single-placeholder templates above. Splitting
+# once at import time means each request only concatenates three strings
+# instead of re-parsing the whole template with str.format().
+# ---------------------------------------------------------------------------
+
+def _split_template(template: str, field: str):
+    head, tail = template.split("{" + field + "}")
+    return head, tail
+
+
+_CODE_ANALYSIS_PARTS = _split_template(CODE_ANALYSIS_PROMPT, "reports_json")
+_JIRA_INVESTIGATION_PARTS = _split_template(JIRA_INVESTIGATION_USER_PROMPT, "ticket_id")
+_JENKINS_INVESTIGATION_PARTS = _split_template(JENKINS_INVESTIGATION_USER_PROMPT, "trace_id")
+
+
+def render_code_analysis_prompt(reports_json: str) -> str:
+    return _CODE_ANALYSIS_PARTS[0] + reports_json + _CODE_ANALYSIS_PARTS[1]
+
+
+def render_jira_investigation_prompt(ticket_id) -> str:
+    return _JIRA_INVESTIGATION_PARTS[0] + str(ticket_id) + _JIRA_INVESTIGATION_PARTS[1]
+
+
+def render_jenkins_investigation_prompt(trace_id) -> str:
+    return _JENKINS_INVESTIGATION_PARTS[0] + str(trace_id) + _JENKINS_INVESTIGATION_PARTS[1]
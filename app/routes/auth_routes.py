@@ -15,6 +15,7 @@ Endpoints:
 """
 
 import os
+import asyncio
 import hashlib
 import datetime
 import logging
@@ -256,7 +257,8 @@ async def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if not user.check_password(form_data.password):
+    # PBKDF2 verification is tens of ms of CPU; keep it off the event loop
+    if not await asyncio.to_thread(user.check_password, form_data.password):
         logger.warning("[AUTH] Login failed — wrong password for user '%s' (ip=%s)", form_data.username, ip)
         _log_login_failure(db, form_data.username, ip, ua, "Incorrect password")
         raise HTTPException(
@@ -1,15 +1,20 @@
-﻿import logging
+﻿import asyncio
+import logging
 import json
 import traceback
 import os
 import time
 import re
+import hashlib
 from pathlib import Path
 from datetime import timedelta, datetime
 from fastapi import APIRouter, HTTPException, Request, Depends
 from fastapi.responses import JSONResponse, StreamingResponse
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import bindparam, insert, select
+from sqlalchemy.exc import DataError, IntegrityError
 from sqlalchemy.orm import Session
+import orjson
 
 from app.prompts import BI_ANALYTICS_PROMPT
 from app.database import get_db_session
@@ -26,23 +31,73 @@ def _mask_secret(value: Optional[str]) -> str:
     s = str(value)
     return (s[:2] + "***" + s[-2:]) if len(s) > 4 else "***"
 
-def _resolve_connection_payload(data: Dict[str, Any], saved: List[Dict[str, Any]]):
+# Confirmed-empty Confluence deltas, keyed by (space, title) then by a digest of
+# the table's column set. When a table's columns are unchanged since the last
+# sync reported nothing missing, the get_table_delta_keys round-trip is skipped.
+_DELTA_CACHE_TTL = 600  # seconds
+_empty_delta_cache: Dict[Tuple[str, str], Dict[str, float]] = {}
+
+
+def _delta_cache_key(tbl: str, all_cols: List[str]) -> str:
+    return hashlib.sha256(f"{tbl}|{','.join(sorted(all_cols))}".encode()).hexdigest()
+
+
+def _is_cached_empty_delta(space: str, title: str, key: str) -> bool:
+    expires_at = _empty_delta_cache.get((space, title), {}).get(key)
+    return expires_at is not None and expires_at > time.monotonic()
+
+
+def _remember_empty_delta(space: str, title: str, key: str) -> None:
+    _empty_delta_cache.setdefault((space, title), {})[key] = time.monotonic() + _DELTA_CACHE_TTL
+
+
+def invalidate_delta_cache(space: str, title: str) -> None:
+    """
+    Drop cached empty deltas for a page after anything is written to it.
+
+    Every path that writes a Confluence key table (the sync routes here, the
+    describe/PR/test writers in client.py, and table creation) must call this.
+    """
+    _empty_delta_cache.pop((space, title), None)
+
+
+def _tool_text(res) -> str:
+    """Concatenate the text parts of an MCP tool result, skipping the copy for the usual single part."""
+    parts = res.content
+    if len(parts) == 1:
+        return parts[0].text
+    return "".join(msg.text for msg in parts)
+
+
+_SSE_DONE = b"data: [DONE]\n\n"
+
+
+def _sse_event(payload: Dict[str, Any]) -> bytes:
+    """Encode one Server-Sent Event frame; orjson writes bytes directly, no str formatting pass."""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+def _resolve_connection_payload(data: Dict[str, Any], user_id: int, db: Session):
     """Allow using connection_id or name to populate host/port/user/... fields."""
     # If full fields provided, return as-is
     required = ["host","port","user","password","database","database_type"]
     if all(k in data and data[k] not in (None, "") for k in required):
         return data
-    # Try resolve by id
+    # Resolve by id, then by name, with an indexed lookup of just that profile
+    # instead of loading and scanning every saved connection of the user
     conn = None
     cid = data.get("connection_id")
     cname = data.get("connection_name") or data.get("name")
+    query = db.query(DBConnection).filter_by(user_id=user_id)
     if cid:
-        conn = next((c for c in saved if str(c.get("id")) == str(cid)), None)
+        try:
+            conn = query.filter_by(id=int(cid)).first()
+        except (TypeError, ValueError):
+            conn = None
     if not conn and cname:
-        conn = next((c for c in saved if c.get("name") == cname), None)
+        conn = query.filter_by(name=cname).order_by(DBConnection.id).first()
     if not conn:
         raise HTTPException(status_code=400, detail="Missing DB credentials and no matching connection profile found")
-    merged = {**conn, **{k:v for k,v in data.items() if v not in (None, "")}}
+    merged = {**_connection_to_dict(conn), **{k:v for k,v in data.items() if v not in (None, "")}}
     # Normalize types
     try:
         merged["port"] = int(merged["port"])  # type: ignore
@@ -51,38 +106,58 @@ def _resolve_connection_payload(data: Dict[str, Any], saved: List[Dict[str, Any]
     return merged
 
 
+def _connection_to_dict(conn: DBConnection) -> Dict[str, Any]:
+    return {
+        "id": conn.id,
+        "name": conn.name,  # Use 'name' field
+        "host": conn.host,  # Use 'host' field
+        "port": conn.port,  # Use 'port' field
+        "user": conn.username,  # Use 'username' field
+        "password": conn.encrypted_password,  # Use 'encrypted_password' field
+        "database": conn.database,  # Use 'database' field
+        "database_type": conn.database_type,  # Use 'database_type' field
+    }
+
+
+# Built once at import; SQLAlchemy's compiled cache then serves every call.
+# Selects only the listed columns so rows come back as tuples, not ORM objects.
+_LIST_CONNECTIONS_STMT = (
+    select(
+        DBConnection.id,
+        DBConnection.name,
+        DBConnection.host,
+        DBConnection.port,
+        DBConnection.username.label("user"),
+        DBConnection.encrypted_password.label("password"),
+        DBConnection.database,
+        DBConnection.database_type,
+    )
+    .where(DBConnection.user_id == bindparam("uid"))
+    .order_by(DBConnection.id)
+)
+
+
 def _load_saved_connections(user_id: int, db: Session) -> List[Dict[str, Any]]:
-    connections = db.query(DBConnection).filter_by(user_id=user_id).all()
-    conn_list = []
-    for conn in connections:
-        conn_list.append({
-            "id": conn.id,
-            "name": conn.name,  # Use 'name' field
-            "host": conn.host,  # Use 'host' field
-            "port": conn.port,  # Use 'port' field
-            "user": conn.username,  # Use 'username' field
-            "password": conn.encrypted_password,  # Use 'encrypted_password' field
-            "database": conn.database,  # Use 'database' field
-            "database_type": conn.database_type,  # Use 'database_type' field
-        })
-    return conn_list
+    rows = db.execute(_LIST_CONNECTIONS_STMT, {"uid": user_id}).mappings()
+    return [dict(row) for row in rows]
 
-def _persist_saved_connections(user_id: int, conn_data: Dict[str, Any], db: Session) -> int:
+def _connection_values(user_id: int, conn_data: Dict[str, Any]) -> Dict[str, Any]:
     # Basic password encoding (TODO: implement proper encryption in production)
-    password = conn_data['password']
     # For now, just store as-is since the field is named encrypted_password
     # In production, you would use proper encryption here
-    
-    new_conn = DBConnection(
+    return dict(
         user_id=user_id,
         name=conn_data['name'],  # Use 'name' not 'connection_name'
         database_type=conn_data['database_type'],  # Use 'database_type' not 'db_type'
         host=conn_data['host'],  # Use 'host' not 'db_host'
         port=conn_data['port'],  # Use 'port' not 'db_port'
         username=conn_data['user'],  # Use 'username' not 'db_user'
-        encrypted_password=password,  # Store password (should be encrypted in production)
+        encrypted_password=conn_data['password'],  # Store password (should be encrypted in production)
         database=conn_data['database']  # Use 'database' not 'db_name'
     )
+
+def _persist_saved_connections(user_id: int, conn_data: Dict[str, Any], db: Session) -> int:
+    new_conn = DBConnection(**_connection_values(user_id, conn_data))
     db.add(new_conn)
     db.commit()
     db.refresh(new_conn)
@@ -132,8 +207,7 @@ async def test_connection(
         logger.debug("Resolving connection parameters from saved profiles or direct input")
         
         # Allow referencing saved profile via connection_id/name
-        saved_connections = _load_saved_connections(current_user.id, db)
-        payload = _resolve_connection_payload(data, saved_connections)
+        payload = _resolve_connection_payload(data, current_user.id, db)
         
         # Extract connection details with validation
         required_fields = ["host", "port", "user", "password", "database", "database_type"]
@@ -298,6 +372,74 @@ async def save_connection(
         logger.error(f"Error saving connection: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/save-connections-bulk")
+async def save_connections_bulk(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Save many database connection configurations in one request (initial imports)
+
+    Args:
+        request (Request): HTTP request whose body is a JSON list of connections,
+            each with the same fields as /save-connection
+
+    Returns:
+        JSONResponse: Success status with the new connection IDs, in input order
+
+    Note:
+        Rows go in as a single multi-row INSERT ... RETURNING id instead of one
+        ORM add/commit per connection; the whole batch is rejected if any
+        entry is missing a required field.
+    """
+    logger.info("POST /save-connections-bulk - Saving database connection configurations")
+
+    try:
+        items = await request.json()
+        if not isinstance(items, list) or not items:
+            raise HTTPException(status_code=400, detail="Expected a non-empty JSON list of connections")
+
+        required_fields = ["host", "port", "user", "password", "database", "database_type", "name"]
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                raise HTTPException(status_code=400, detail=f"Connection #{index}: expected a JSON object")
+            missing_fields = [field for field in required_fields if field not in item]
+            if missing_fields:
+                logger.warning(f"Missing required fields for connection #{index}: {missing_fields}")
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Connection #{index}: missing required fields: {', '.join(missing_fields)}"
+                )
+
+        rows = [_connection_values(current_user.id, item) for item in items]
+        ids = db.execute(
+            insert(DBConnection).returning(DBConnection.id, sort_by_parameter_order=True),
+            rows,
+        ).scalars().all()
+        db.commit()
+
+        logger.info(f"Successfully saved {len(ids)} connections for user {current_user.username}")
+
+        return JSONResponse({
+            "ids": [str(i) for i in ids],
+            "success": True,
+            "message": f"{len(ids)} connections saved successfully"
+        })
+
+    except HTTPException:
+        raise
+    # SQLAlchemy error text embeds the bound parameters, i.e. every row's
+    # password, so neither the log line nor the response repeats it
+    except (IntegrityError, DataError) as e:
+        db.rollback()
+        logger.warning(f"Rejected bulk connection save: {type(e).__name__}")
+        raise HTTPException(status_code=400, detail="One or more connections are invalid or already exist")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error bulk-saving connections: {type(e).__name__}")
+        raise HTTPException(status_code=500, detail="Failed to save connections")
+
 @router.delete("/delete-connection/{connection_id}")
 async def delete_connection(
     connection_id: int,
@@ -378,8 +520,7 @@ async def list_tables(
         data = await request.json()
 
         # Resolve from profile if needed
-        saved_connections = _load_saved_connections(current_user.id, db)
-        data = _resolve_connection_payload(data, saved_connections)
+        data = _resolve_connection_payload(data, current_user.id, db)
 
         logger.info("Listing tables for %s on %s:%s/%s", data['database_type'], data['host'], data['port'], data['database'])
 
@@ -442,8 +583,7 @@ async def describe_columns(
         data = await request.json()
         
         # Resolve from profile
-        saved_connections = _load_saved_connections(current_user.id, db)
-        data = _resolve_connection_payload(data, saved_connections)
+        data = _resolve_connection_payload(data, current_user.id, db)
         if "table" not in data:
             return JSONResponse(status_code=400, content={"status":"error","error":"Missing required field: table"})
         
@@ -513,8 +653,7 @@ async def get_table_rows(
     from app.client import _mcp_session  # local import to avoid circular dependency
     try:
         data = await request.json()
-        saved_connections = _load_saved_connections(current_user.id, db)
-        data = _resolve_connection_payload(data, saved_connections)
+        data = _resolve_connection_payload(data, current_user.id, db)
         if "table" not in data:
             return JSONResponse(status_code=400, content={"status":"error","error":"Missing required field: table"})
         limit = int(data.get("limit", 100))
@@ -623,8 +762,7 @@ async def suggest_columns(
         logger.info("suggest_columns: received request with payload keys: %s", list(data.keys()))
         
         # Resolve connection profile first
-        saved_connections = _load_saved_connections(current_user.id, db)
-        data = _resolve_connection_payload(data, saved_connections)
+        data = _resolve_connection_payload(data, current_user.id, db)
         
         logger.info(
             "suggest_columns: start space=%r title=%r host=%s port=%s db=%s user=%s",
@@ -1000,8 +1138,7 @@ async def analytics_query(
         logger.debug(f"Request payload keys: {list(data.keys())}")
         
         # Resolve connection profile first
-        saved_connections = _load_saved_connections(current_user.id, db)
-        data = _resolve_connection_payload(data, saved_connections)
+        data = _resolve_connection_payload(data, current_user.id, db)
         
         logger.info(
             f"Analytics query - Connection: {data.get('database_type')} database '{data.get('database')}' "
@@ -1230,13 +1367,15 @@ async def analytics_query(
         
         logger.debug("Processing MCP tool response content")
         
-        for i, msg in enumerate(result.content):
+        content_parts = result.content
+        for i, msg in enumerate(content_parts):
             msg_text = getattr(msg, 'text', '')
-            logger.debug(f"Processing response part {i+1}/{len(result.content)} (length: {len(msg_text)})")
+            logger.debug("Processing response part %d/%d (length: %d)", i + 1, len(content_parts), len(msg_text))
             
-            # The MCP server returns {"rows": rows, "sql": sql} as JSON
+            # The MCP server returns {"rows": rows, "sql": sql} as JSON; orjson parses
+            # large row sets several times faster and raises a json.JSONDecodeError subclass
             try:
-                response_data = json.loads(msg_text)
+                response_data = orjson.loads(msg_text)
                 if isinstance(response_data, dict) and 'rows' in response_data:
                     # This is the structured response from MCP server
                     rows = response_data.get('rows', [])
@@ -1251,10 +1390,10 @@ async def analytics_query(
                         logger.warning("⚠️ No SQL query found in response - this may indicate LLM generation failure")
                     break  # We found the main response, no need to process other parts
                 else:
-                    logger.debug(f"Response part {i+1} contains JSON but not in expected format")
+                    logger.debug("Response part %d contains JSON but not in expected format", i + 1)
             except json.JSONDecodeError:
                 # Not JSON, might be additional text from the AI
-                logger.debug(f"Response part {i+1} is not JSON (length: {len(msg_text)})")
+                logger.debug("Response part %d is not JSON (length: %d)", i + 1, len(msg_text))
                 # Log the raw text in case it contains error information
                 if "error" in msg_text.lower() or "exception" in msg_text.lower():
                     logger.warning(f"Possible error in response part {i+1}: {msg_text}")
@@ -1324,10 +1463,6 @@ async def analytics_query(
             }
         )
 
-# In-memory storage for connections (would be replaced with a persistent store)
-# saved_connections: List[Dict[str, Any]] = _load_saved_connections()
-connection_id_counter = 1
-
 @router.post("/sync-all-tables")
 async def sync_all_tables(
     request: Request,
@@ -1365,8 +1500,7 @@ async def sync_all_tables_with_progress(
         logger.info("sync_all_tables: received request with payload keys: %s", list(data.keys()))
         
         # Resolve connection profile first
-        saved_connections = _load_saved_connections(current_user.id, db)
-        data = _resolve_connection_payload(data, saved_connections)
+        data = _resolve_connection_payload(data, current_user.id, db)
         
         logger.info(
             "sync_all_tables: start space=%r title=%r host=%s port=%s db=%s user=%s limit=%s",
@@ -1399,23 +1533,24 @@ async def sync_all_tables_with_progress(
             "database_type": data["database_type"],
         }
 
-        # --- Step 1: List tables ---
-        logger.info("sync_all_tables: fetching list of tables")
-        list_res = await _mcp_session.call_tool(
-            "list_database_tables",
-            arguments=common_args,
-            read_timeout_seconds=timedelta(seconds=60),
+        # --- Steps 1 & 2: List tables and fetch schema map ---
+        # The two reads are independent, so issue them together
+        logger.info("sync_all_tables: fetching list of tables and database keys/schema")
+        list_res, keys_res = await asyncio.gather(
+            _mcp_session.call_tool(
+                "list_database_tables",
+                arguments=common_args,
+                read_timeout_seconds=timedelta(seconds=60),
+            ),
+            _mcp_session.call_tool(
+                "list_database_keys",
+                arguments=common_args,
+                read_timeout_seconds=timedelta(seconds=60),
+            ),
         )
         tables = json.loads(list_res.content[0].text)
         logger.info("sync_all_tables: found %d tables: %s", len(tables), tables[:5])  # Log first 5 tables
 
-        # --- Step 2: Fetch schema map ---
-        logger.info("sync_all_tables: fetching database keys/schema")
-        keys_res = await _mcp_session.call_tool(
-            "list_database_keys",
-            arguments=common_args,
-            read_timeout_seconds=timedelta(seconds=60),
-        )
         schema_map = json.loads(keys_res.content[0].text)
         logger.debug("sync_all_tables: schema map keys: %s", list(schema_map.keys())[:10])  # Log first 10 schema keys
 
@@ -1435,6 +1570,9 @@ async def sync_all_tables_with_progress(
             if table_init_res.content:
                 table_init_info = json.loads(table_init_res.content[0].text)
                 logger.info("✅ Table initialization result: %s", table_init_info.get("message", "Unknown"))
+                if table_init_info.get("updated"):
+                    # The table was (re)created, so earlier "nothing missing" results no longer hold
+                    invalidate_delta_cache(data["space"], data["title"])
             else:
                 logger.warning("⚠️ Table initialization returned no content")
                 
@@ -1457,9 +1595,17 @@ async def sync_all_tables_with_progress(
                 results.append({"table": tbl, "newColumns": [], "error": "no_schema"})
                 continue
 
+            delta_key = _delta_cache_key(tbl, all_cols)
+            if _is_cached_empty_delta(data["space"], data["title"], delta_key):
+                logger.info("sync_all_tables: columns of %s unchanged since last empty delta, skipping lookup", tbl)
+                results.append({"table": tbl, "newColumns": [], "error": None})
+                continue
+
             # --- Step 3a: Compute delta (which columns are missing from Confluence) ---
+            prefix = tbl + "."
+            qualified_cols = list(map(prefix.__add__, all_cols))
             logger.debug("sync_all_tables: computing delta for table %s with %d columns", tbl, len(all_cols))
-            logger.info("🔍 About to call get_table_delta_keys for table %s with columns: %s", tbl, [f"{tbl}.{c}" for c in all_cols][:5])
+            logger.info("🔍 About to call get_table_delta_keys for table %s with columns: %s", tbl, qualified_cols[:5])
             
             try:
                 delta_res = await _mcp_session.call_tool(
@@ -1467,18 +1613,19 @@ async def sync_all_tables_with_progress(
                     arguments={
                         "space": data["space"],
                         "title": data["title"],
-                        "columns": [f"{tbl}.{c}" for c in all_cols]
+                        "columns": qualified_cols
                     },
                     read_timeout_seconds=timedelta(seconds=60),
                 )
-                delta_chunks = [msg.text for msg in delta_res.content]
-                delta_text = "".join(delta_chunks)
+                delta_text = _tool_text(delta_res)
                 logger.info("📊 get_table_delta_keys returned: %s", delta_text[:500])
                 logger.debug("sync_all_tables: delta JSON for %s: %s", tbl, delta_text[:200])
                 
                 try:
-                    missing = json.loads(delta_text)
+                    missing = orjson.loads(delta_text)
                     logger.info("✅ Successfully parsed delta JSON: %d missing columns", len(missing))
+                    if not missing:
+                        _remember_empty_delta(data["space"], data["title"], delta_key)
                 except Exception as parse_e:
                     logger.error("❌ Failed to parse delta JSON for %s: %s. Raw response: %s", tbl, parse_e, delta_text[:300])
                     missing = []
@@ -1501,17 +1648,16 @@ async def sync_all_tables_with_progress(
                 arguments={
                     **common_args,
                     "table": tbl,
-                    "columns": [c.split(".", 1)[1] for c in missing],
+                    "columns": [c[len(prefix):] if c.startswith(prefix) else c.split(".", 1)[1] for c in missing],
                     "limit": data["limit"],
                 },
                 read_timeout_seconds=None,
             )
-            desc_chunks = [msg.text for msg in desc_res.content]
-            desc_text = "".join(desc_chunks)
+            desc_text = _tool_text(desc_res)
             logger.debug("sync_all_tables: description JSON for %s (length=%d)", tbl, len(desc_text))
             
             try:
-                descriptions = json.loads(desc_text)
+                descriptions = orjson.loads(desc_text)
                 logger.info("✅ Parsed descriptions JSON: %d entries", len(descriptions))
                 if descriptions:
                     logger.debug("📋 Sample description entry: %s", descriptions[0])
@@ -1522,7 +1668,10 @@ async def sync_all_tables_with_progress(
             # --- Step 3c: Sync delta descriptions to Confluence ---
             logger.info("🔗 About to sync %d descriptions to Confluence for table %s", len(descriptions), tbl)
             if not descriptions:
-                logger.warning("⚠️  No descriptions to sync for table %s - this might prevent table creation!", tbl)
+                # Nothing to write; the page/table itself was already ensured in Step 2.5
+                logger.warning("⚠️  No descriptions to sync for table %s - skipping Confluence call", tbl)
+                results.append({"table": tbl, "newColumns": [], "error": None})
+                continue
             
             logger.debug("sync_all_tables: syncing %d descriptions to Confluence for table %s", len(descriptions), tbl)
             sync_res = await _mcp_session.call_tool(
@@ -1536,6 +1685,7 @@ async def sync_all_tables_with_progress(
             )
             
             logger.info("📊 sync_confluence_table_delta completed for table %s", tbl)
+            invalidate_delta_cache(data["space"], data["title"])
             logger.debug("📋 Raw sync response: %s", sync_res.content[0].text if sync_res.content else "No content")
             
             sync_info = {"delta": []}
@@ -1616,8 +1766,7 @@ async def sync_all_tables_with_progress_stream(
         logger.info("sync_all_tables_with_progress_stream: received request")
         
         # Resolve connection profile first
-        saved_connections = _load_saved_connections(current_user.id, db)
-        data = _resolve_connection_payload(data, saved_connections)
+        data = _resolve_connection_payload(data, current_user.id, db)
         
         # Validate required fields
         required = ["host", "port", "user", "password", "database", "database_type", "space", "title", "limit"]
@@ -1666,7 +1815,7 @@ async def sync_all_tables_with_progress_stream(
                 },
                 "start_time": time.time()
             }
-            yield f"data: {json.dumps(progress_data)}\n\n"
+            yield _sse_event(progress_data)
 
             # --- Stage 1: List tables (5% of progress) ---
             logger.info("sync_all_tables_with_progress_stream: Stage 1 - Listing tables")
@@ -1675,12 +1824,20 @@ async def sync_all_tables_with_progress_stream(
                 "progress_percentage": 5,
                 "stage_details": "Fetching database tables..."
             })
-            yield f"data: {json.dumps(progress_data)}\n\n"
+            yield _sse_event(progress_data)
             
-            list_res = await _mcp_session.call_tool(
-                "list_database_tables",
-                arguments=common_args,
-                read_timeout_seconds=timedelta(seconds=60),
+            # The schema map (stage 2) doesn't depend on the table list; fetch both at once
+            list_res, keys_res = await asyncio.gather(
+                _mcp_session.call_tool(
+                    "list_database_tables",
+                    arguments=common_args,
+                    read_timeout_seconds=timedelta(seconds=60),
+                ),
+                _mcp_session.call_tool(
+                    "list_database_keys",
+                    arguments=common_args,
+                    read_timeout_seconds=timedelta(seconds=60),
+                ),
             )
             tables = json.loads(list_res.content[0].text)
             logger.info("sync_all_tables_with_progress_stream: found %d tables", len(tables))
@@ -1690,7 +1847,7 @@ async def sync_all_tables_with_progress_stream(
                 "tables_pending": tables.copy(),
                 "summary": {"total_tables": len(tables), "successful_tables": 0, "failed_tables": 0, "total_synced_columns": 0}
             })
-            yield f"data: {json.dumps(progress_data)}\n\n"
+            yield _sse_event(progress_data)
 
             # --- Stage 2: Fetch schema map (10% of progress) ---
             logger.info("sync_all_tables_with_progress_stream: Stage 2 - Fetching schema")
@@ -1699,13 +1856,8 @@ async def sync_all_tables_with_progress_stream(
                 "progress_percentage": 10,
                 "stage_details": "Loading database schema and keys..."
             })
-            yield f"data: {json.dumps(progress_data)}\n\n"
+            yield _sse_event(progress_data)
             
-            keys_res = await _mcp_session.call_tool(
-                "list_database_keys",
-                arguments=common_args,
-                read_timeout_seconds=timedelta(seconds=60),
-            )
             schema_map = json.loads(keys_res.content[0].text)
             logger.info("sync_all_tables_with_progress_stream: loaded schema for %d tables", len(schema_map))
 
@@ -1716,7 +1868,7 @@ async def sync_all_tables_with_progress_stream(
                 "progress_percentage": 12,
                 "stage_details": "Creating Confluence table structure if needed..."
             })
-            yield f"data: {json.dumps(progress_data)}\n\n"
+            yield _sse_event(progress_data)
             
             try:
                 table_init_res = await _mcp_session.call_tool(
@@ -1732,17 +1884,20 @@ async def sync_all_tables_with_progress_stream(
                 if table_init_res.content:
                     table_init_info = json.loads(table_init_res.content[0].text)
                     logger.info("✅ Table initialization result: %s", table_init_info.get("message", "Unknown"))
+                    if table_init_info.get("updated"):
+                        # The table was (re)created, so earlier "nothing missing" results no longer hold
+                        invalidate_delta_cache(data["space"], data["title"])
                     progress_data["stage_details"] = f"Table structure ready: {table_init_info.get('message', 'Unknown status')}"
                 else:
                     logger.warning("⚠️ Table initialization returned no content")
                     progress_data["stage_details"] = "Table structure status unknown"
                     
-                yield f"data: {json.dumps(progress_data)}\n\n"
+                yield _sse_event(progress_data)
                     
             except Exception as table_init_error:
                 logger.error("❌ Failed to initialize table structure: %s", table_init_error)
                 progress_data["stage_details"] = f"Table initialization failed: {str(table_init_error)}"
-                yield f"data: {json.dumps(progress_data)}\n\n"
+                yield _sse_event(progress_data)
                 # Continue anyway - the individual sync calls might still work
 
             # --- Stage 3: Process each table (85% of progress, distributed among tables) ---
@@ -1762,7 +1917,7 @@ async def sync_all_tables_with_progress_stream(
                     "stage_details": f"Processing table '{tbl}' ({table_index + 1}/{len(tables)})",
                     "tables_pending": tables[table_index + 1:]
                 })
-                yield f"data: {json.dumps(progress_data)}\n\n"
+                yield _sse_event(progress_data)
                 
                 all_cols = schema_map.get(tbl, [])
                 if not all_cols:
@@ -1773,11 +1928,22 @@ async def sync_all_tables_with_progress_stream(
                     progress_data["summary"]["failed_tables"] += 1
                     continue
 
+                delta_key = _delta_cache_key(tbl, all_cols)
+                if _is_cached_empty_delta(data["space"], data["title"], delta_key):
+                    logger.info("sync_all_tables_with_progress_stream: columns of %s unchanged since last empty delta, skipping lookup", tbl)
+                    result = {"table": tbl, "newColumns": [], "error": None, "stage": "completed"}
+                    results.append(result)
+                    progress_data["tables_processed"].append(result)
+                    progress_data["summary"]["successful_tables"] += 1
+                    continue
+
                 # Sub-stage 3a: Compute delta
                 progress_data["stage_details"] = f"Computing delta for table '{tbl}' - checking {len(all_cols)} columns"
-                yield f"data: {json.dumps(progress_data)}\n\n"
+                yield _sse_event(progress_data)
+                prefix = tbl + "."
+                qualified_cols = list(map(prefix.__add__, all_cols))
                 logger.debug("sync_all_tables_with_progress_stream: computing delta for table %s", tbl)
-                logger.info("🔍 About to call get_table_delta_keys for table %s with columns: %s", tbl, [f"{tbl}.{c}" for c in all_cols][:5])
+                logger.info("🔍 About to call get_table_delta_keys for table %s with columns: %s", tbl, qualified_cols[:5])
                 
                 try:
                     delta_res = await _mcp_session.call_tool(
@@ -1785,17 +1951,18 @@ async def sync_all_tables_with_progress_stream(
                         arguments={
                             "space": data["space"],
                             "title": data["title"],
-                            "columns": [f"{tbl}.{c}" for c in all_cols]
+                            "columns": qualified_cols
                         },
                         read_timeout_seconds=timedelta(seconds=60),
                     )
-                    delta_chunks = [msg.text for msg in delta_res.content]
-                    delta_text = "".join(delta_chunks)
+                    delta_text = _tool_text(delta_res)
                     logger.info("📊 get_table_delta_keys returned: %s", delta_text[:500])
                     
                     try:
-                        missing = json.loads(delta_text)
+                        missing = orjson.loads(delta_text)
                         logger.info("✅ Successfully parsed delta JSON: %d missing columns", len(missing))
+                        if not missing:
+                            _remember_empty_delta(data["space"], data["title"], delta_key)
                     except Exception as parse_e:
                         logger.error("❌ Failed to parse delta JSON for %s: %s. Raw response: %s", tbl, parse_e, delta_text[:300])
                         missing = []
@@ -1807,7 +1974,7 @@ async def sync_all_tables_with_progress_stream(
                 if not missing:
                     logger.info("sync_all_tables_with_progress_stream: no missing columns for table %s", tbl)
                     progress_data["stage_details"] = f"No new columns found for table '{tbl}' - already up to date"
-                    yield f"data: {json.dumps(progress_data)}\n\n"
+                    yield _sse_event(progress_data)
                     
                     result = {"table": tbl, "newColumns": [], "error": None, "stage": "completed"}
                     results.append(result)
@@ -1817,7 +1984,7 @@ async def sync_all_tables_with_progress_stream(
 
                 # Sub-stage 3b: Describe missing columns
                 progress_data["stage_details"] = f"Found {len(missing)} missing columns for '{tbl}' - generating descriptions"
-                yield f"data: {json.dumps(progress_data)}\n\n"
+                yield _sse_event(progress_data)
                 logger.info("sync_all_tables_with_progress_stream: found %d missing columns for table %s", len(missing), tbl)
                 
                 desc_res = await _mcp_session.call_tool(
@@ -1825,23 +1992,30 @@ async def sync_all_tables_with_progress_stream(
                     arguments={
                         **common_args,
                         "table": tbl,
-                        "columns": [c.split(".", 1)[1] for c in missing],
+                        "columns": [c[len(prefix):] if c.startswith(prefix) else c.split(".", 1)[1] for c in missing],
                         "limit": data["limit"],
                     },
                     read_timeout_seconds=None,
                 )
-                desc_chunks = [msg.text for msg in desc_res.content]
-                desc_text = "".join(desc_chunks)
+                desc_text = _tool_text(desc_res)
                 
                 try:
-                    descriptions = json.loads(desc_text)
+                    descriptions = orjson.loads(desc_text)
                 except Exception as e:
                     logger.error("sync_all_tables_with_progress_stream: failed to parse descriptions JSON for %s: %s", tbl, e)
                     descriptions = []
 
+                if not descriptions:
+                    logger.warning("sync_all_tables_with_progress_stream: no descriptions for table %s - skipping Confluence call", tbl)
+                    result = {"table": tbl, "newColumns": [], "error": None, "stage": "completed"}
+                    results.append(result)
+                    progress_data["tables_processed"].append(result)
+                    progress_data["summary"]["successful_tables"] += 1
+                    continue
+
                 # Sub-stage 3c: Sync to Confluence
                 progress_data["stage_details"] = f"Syncing {len(descriptions)} descriptions to Confluence for table '{tbl}'"
-                yield f"data: {json.dumps(progress_data)}\n\n"
+                yield _sse_event(progress_data)
                 logger.debug("sync_all_tables_with_progress_stream: syncing descriptions to Confluence for table %s", tbl)
                 
                 sync_res = await _mcp_session.call_tool(
@@ -1854,6 +2028,8 @@ async def sync_all_tables_with_progress_stream(
                     read_timeout_seconds=timedelta(seconds=300),
                 )
                 
+                invalidate_delta_cache(data["space"], data["title"])
+
                 sync_info = {"delta": []}
                 if sync_res.content:
                     try:
@@ -1866,7 +2042,7 @@ async def sync_all_tables_with_progress_stream(
 
                 # Update completion for this table
                 progress_data["stage_details"] = f"Completed table '{tbl}' - synced {len(synced_columns)} new columns"
-                yield f"data: {json.dumps(progress_data)}\n\n"
+                yield _sse_event(progress_data)
 
                 result = {"table": tbl, "newColumns": synced_columns, "error": None, "stage": "completed"}
                 results.append(result)
@@ -1904,8 +2080,8 @@ async def sync_all_tables_with_progress_stream(
                 "duration": duration
             }
 
-            yield f"data: {json.dumps(final_progress)}\n\n"
-            yield f"data: [DONE]\n\n"
+            yield _sse_event(final_progress)
+            yield _SSE_DONE
 
             logger.info(
                 "sync_all_tables_with_progress_stream: completed - %d tables processed, %d successful, %d failed, %d total columns synced in %.1fs",
@@ -1918,7 +2094,7 @@ async def sync_all_tables_with_progress_stream(
                 "status": "error",
                 "error": f"Table sync failed: {str(e)}"
             }
-            yield f"data: {json.dumps(error_data)}\n\n"
+            yield _sse_event(error_data)
 
     return StreamingResponse(
         generate_progress_stream(),
@@ -1975,6 +2151,13 @@ async def get_api_endpoints():
                 "parameters": ["connection_name", "host", "port", "user", "password", "database", "database_type"],
                 "tags": ["database"]
             },
+            {
+                "path": "/api/save-connections-bulk",
+                "method": "POST",
+                "description": "Save a list of database connections in one request",
+                "parameters": ["[name, host, port, user, password, database, database_type]"],
+                "tags": ["database"]
+            },
             {
                 "path": "/api/get-connections",
                 "method": "GET", 
@@ -2208,9 +2391,8 @@ async def iterative_dbt_query(
         confluence_title = data.get("confluence_title", "")
         
         # Extract and resolve connection details using same pattern as other endpoints
-        saved_connections = _load_saved_connections(current_user.id, db)
         connection_data = data.get("connection", {})
-        connection = _resolve_connection_payload(connection_data, saved_connections)
+        connection = _resolve_connection_payload(connection_data, current_user.id, db)
         
         logger.info(f"📊 Analytics prompt: {analytics_prompt[:100]}...")
         logger.info(f"📋 Confluence context: {confluence_space}/{confluence_title}")
@@ -16,9 +16,11 @@ Author: Nova Nexus Engine
 Date: August 2025
 """
 
+import asyncio
 import logging
 import json
 import time
+from contextlib import AsyncExitStack
 from datetime import timedelta
 from typing import Dict, List, Any, Optional
 from fastapi import APIRouter, Request, HTTPException
@@ -28,6 +30,7 @@ from pydantic import BaseModel
 from datetime import timedelta
 from mcp import ClientSession
 from mcp.client.streamable_http import streamablehttp_client
+from app.utils.mcp_utils import create_pooled_mcp_http_client, MCP_SESSION_POOL_SIZE
 
 # Set up logging for this module
 logger = logging.getLogger(__name__)
@@ -47,27 +50,54 @@ async def connect_mcp(req: ConnectRequest):
     
     logger.info(f"Attempting to connect to MCP server at {req.url}")
     try:
-        # If there's an existing session, we might want to close it or just let the exit stack handle it on shutdown
-        # For simplicity, we just add the new connection to the exit stack and update the global reference
-        
-        http_transport = await client._exit_stack.enter_async_context(
-            streamablehttp_client(
-                req.url,
-                timeout=timedelta(seconds=600),
-                sse_read_timeout=timedelta(seconds=600)
-            )
-        )
-        read_stream, write_stream, _ = http_transport
-        
-        new_session = await client._exit_stack.enter_async_context(
-            ClientSession(read_stream, write_stream)
-        )
-        await new_session.initialize()
-        new_session._url = req.url
-        
-        # Update the global session
-        client._mcp_session = new_session
+        # Each pool gets its own exit stack, so a reconnect can close the previous
+        # pool and a failed connect can release the sessions it already opened.
+        # The sessions are opened one by one: the transports own anyio task
+        # groups, which must be entered from this task.
+        pool_stack = AsyncExitStack()
+        sessions = []
+        try:
+            for _ in range(MCP_SESSION_POOL_SIZE):
+                http_transport = await pool_stack.enter_async_context(
+                    streamablehttp_client(
+                        req.url,
+                        timeout=timedelta(seconds=600),
+                        sse_read_timeout=timedelta(seconds=600),
+                        httpx_client_factory=create_pooled_mcp_http_client,
+                    )
+                )
+                read_stream, write_stream, _ = http_transport
+
+                session = await pool_stack.enter_async_context(
+                    ClientSession(read_stream, write_stream)
+                )
+                await session.initialize()
+                session._url = req.url
+                sessions.append(session)
+        except BaseException:
+            await pool_stack.aclose()
+            raise
+
+        pool = asyncio.Queue()
+        for session in sessions:
+            pool.put_nowait(session)
+
+        # Update the global session; the first one doubles as the primary session
+        # read directly by status checks and other modules
+        old_stack = client._mcp_pool_stack
+        client._mcp_session = sessions[0]
+        client._mcp_pool = pool
+        client._mcp_pool_stack = pool_stack
         logger.info(f"Successfully connected to MCP server at {req.url}")
+
+        # Release the replaced pool's sessions and HTTP clients
+        if old_stack is not None:
+            try:
+                await old_stack.aclose()
+            except Exception as close_error:
+                # Transports entered by an earlier request task may refuse to exit
+                # from this one; the new pool is already live, so only log it
+                logger.warning(f"Error closing previous MCP session pool: {close_error}")
         
         return JSONResponse({
             "status": "success",
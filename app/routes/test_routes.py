@@ -46,6 +46,17 @@ class TestResponse(BaseModel):
     class Config:
         orm_mode = True
 
+def _config_dict(test: Test) -> dict:
+    """Return a test's configuration as a fresh dict.
+
+    The column is JSON, so new rows come back already decoded; rows written
+    before that stored a JSON-encoded string and still need one json.loads.
+    """
+    config = test.configuration
+    if isinstance(config, str):
+        return json.loads(config)
+    return dict(config)
+
 @router.post("/tests", response_model=TestResponse)
 async def save_test(
     test_in: CreateTestRequest,
@@ -59,7 +70,7 @@ async def save_test(
     logger.info(f"User {current_user.username} is saving a new test: {test_in.name} (category: {test_in.test_category})")
     try:
         # Build the test data based on test category
-        test_data_json = json.dumps({
+        test_data = {
             "endpoint_path": test_in.endpoint_path,
             "method": test_in.method,
             "parameters": [p.dict() for p in test_in.parameters],
@@ -67,19 +78,18 @@ async def save_test(
             "test_category": test_in.test_category,
             "server_id": test_in.server_id,
             "tool_name": test_in.tool_name,
-        })
+        }
 
         new_test = Test(
             user_id=current_user.id,
             name=test_in.name,
             test_type=test_in.test_category,  # Use test_category as test_type
-            configuration=test_data_json
+            configuration=test_data
         )
         db.add(new_test)
         db.commit()
         db.refresh(new_test)
-        
-        test_data = json.loads(new_test.configuration)
+
         response = TestResponse(
             id=new_test.id,
             name=new_test.name,
@@ -108,7 +118,7 @@ async def get_saved_tests(
         tests = db.query(Test).filter(Test.user_id == current_user.id).order_by(Test.created_at.desc()).all()
         response = []
         for test in tests:
-            test_data = json.loads(test.configuration)
+            test_data = _config_dict(test)
             
             # Filter by category if specified
             if test_category and test_data.get("test_category", "client") != test_category:
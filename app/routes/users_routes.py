@@ -1,7 +1,9 @@
+import asyncio
 import datetime
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
+from sqlalchemy import exists, select
 from sqlalchemy.orm import Session
 from app.database import get_db_session
 from app.models import User
@@ -68,6 +70,11 @@ def is_admin(current_user: User = Depends(get_current_user)):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
     return current_user
 
+
+def _user_exists(db: Session, *criteria) -> bool:
+    """Uniqueness probe: SELECT EXISTS(...) instead of hydrating a User (and its groups)."""
+    return db.execute(select(exists().where(*criteria))).scalar()
+
 @router.get("/users")
 async def get_all_users(db: Session = Depends(get_db_session), current_user: User = Depends(get_current_user)):
     """
@@ -117,7 +124,8 @@ async def change_user_password(
         
         # Update password using the User model's method if available
         if hasattr(user, 'set_password'):
-            user.set_password(password_request.new_password)
+            # PBKDF2 hashing is tens of ms of CPU; keep it off the event loop
+            await asyncio.to_thread(user.set_password, password_request.new_password)
         else:
             # Fallback to direct bcrypt hashing
             salt = bcrypt.gensalt()
@@ -160,14 +168,12 @@ async def create_user(user: UserCreate, db: Session = Depends(get_db_session)):
         UserResponse: The newly created user object.
     """
     # Check if username already exists
-    db_user = db.query(User).filter(User.username == user.username).first()
-    if db_user:
+    if _user_exists(db, User.username == user.username):
         raise HTTPException(status_code=400, detail="Username already registered")
     
     # Check if email already exists (if provided)
     if user.email:
-        existing_email = db.query(User).filter(User.email == user.email).first()
-        if existing_email:
+        if _user_exists(db, User.email == user.email):
             raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create new user
@@ -179,7 +185,7 @@ async def create_user(user: UserCreate, db: Session = Depends(get_db_session)):
         is_admin=False,
         preferences={}
     )
-    new_user.set_password(user.password)
+    await asyncio.to_thread(new_user.set_password, user.password)  # Hash off the event loop
     
     db.add(new_user)
     db.commit()
@@ -211,15 +217,13 @@ async def update_user(user_id: int, user_update: UserUpdate, db: Session = Depen
     
     # Check username uniqueness if being changed
     if user_update.username and user_update.username != db_user.username:
-        existing_user = db.query(User).filter(User.username == user_update.username).first()
-        if existing_user and existing_user.id != user_id:
+        if _user_exists(db, User.username == user_update.username, User.id != user_id):
             raise HTTPException(status_code=400, detail="Username already registered")
         db_user.username = user_update.username
     
     # Check email uniqueness if being changed
     if user_update.email and user_update.email != getattr(db_user, 'email', None):
-        existing_email = db.query(User).filter(User.email == user_update.email).first()
-        if existing_email and existing_email.id != user_id:
+        if _user_exists(db, User.email == user_update.email, User.id != user_id):
             raise HTTPException(status_code=400, detail="Email already registered")
         db_user.email = user_update.email
     
@@ -228,7 +232,7 @@ async def update_user(user_id: int, user_update: UserUpdate, db: Session = Depen
         db_user.full_name = user_update.full_name
         
     if user_update.password:
-        db_user.set_password(user_update.password)
+        await asyncio.to_thread(db_user.set_password, user_update.password)  # Hash off the event loop
         
     db.commit()
     db.refresh(db_user)
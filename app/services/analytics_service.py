@@ -13,6 +13,7 @@ import threading
 import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from app.models import (
@@ -22,6 +23,9 @@ from app.models import (
 
 logger = logging.getLogger(__name__)
 
+# Max rows removed per DELETE/commit when purging old analytics data.
+_CLEANUP_BATCH_SIZE = 10000
+
 
 class AnalyticsService:
     """Service for managing analytics data and background tasks."""
@@ -301,6 +305,26 @@ class AnalyticsService:
             server.last_check = datetime.utcnow()
             server.total_requests += 1
 
+    def _purge_before(self, db: Session, table: str, cutoff: datetime) -> int:
+        """Delete rows of *table* older than *cutoff* in committed batches.
+
+        Each batch removes at most ``_CLEANUP_BATCH_SIZE`` rows via ``ctid`` so
+        row locks and WAL per transaction stay bounded on large tables, and no
+        ORM objects are loaded. *table* must be one of our own table names.
+        """
+        stmt = text(
+            f"DELETE FROM {table} WHERE ctid IN ("
+            f"SELECT ctid FROM {table} WHERE timestamp < :cutoff LIMIT :batch)"
+        )
+        total = 0
+        while not self._stop_event.is_set():
+            res = db.execute(stmt, {"cutoff": cutoff, "batch": _CLEANUP_BATCH_SIZE})
+            db.commit()
+            total += res.rowcount
+            if res.rowcount < _CLEANUP_BATCH_SIZE:
+                break
+        return total
+
     def _cleanup_old_data_thread(self) -> None:
         """Daemon thread: purge old analytics rows once per day."""
         logger.info("[ANALYTICS] Data-cleanup thread started.")
@@ -314,22 +338,9 @@ class AnalyticsService:
                     db: Session = SessionLocal()
                     try:
                         now = datetime.utcnow()
-                        deleted_logs = (
-                            db.query(RequestLog)
-                            .filter(RequestLog.timestamp < now - timedelta(days=30))
-                            .delete()
-                        )
-                        deleted_views = (
-                            db.query(PageView)
-                            .filter(PageView.timestamp < now - timedelta(days=90))
-                            .delete()
-                        )
-                        deleted_metrics = (
-                            db.query(SystemMetrics)
-                            .filter(SystemMetrics.timestamp < now - timedelta(days=7))
-                            .delete()
-                        )
-                        db.commit()
+                        deleted_logs = self._purge_before(db, RequestLog.__tablename__, now - timedelta(days=30))
+                        deleted_views = self._purge_before(db, PageView.__tablename__, now - timedelta(days=90))
+                        deleted_metrics = self._purge_before(db, SystemMetrics.__tablename__, now - timedelta(days=7))
                         if deleted_logs or deleted_views or deleted_metrics:
                             logger.info(
                                 "[ANALYTICS] Cleanup: %d request logs, %d page views, %d metrics removed.",
@@ -0,0 +1,80 @@
+"""
+Coalescing of Confluence delta syncs from concurrent PR webhooks.
+
+Submissions for the same (space, title) arriving within a short window are
+merged into one sync call; each submitter gets back only its share of the
+delta. Kept free of FastAPI/MCP imports: the actual sync is injected, so the
+batching can be exercised on its own.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (space, title, merged keys) -> parsed tool result ({"delta": [...], ...})
+SyncFn = Callable[[str, str, List[str]], Awaitable[Dict[str, Any]]]
+
+
+class DeltaBatcher:
+    """Merge same-page delta submissions into one sync call per window."""
+
+    def __init__(self, sync: SyncFn, window: float = 0.05, max_keys: int = 64):
+        self._sync = sync
+        self._window = window
+        self._max_keys = max_keys
+        # (space, title) -> {"items": [(keys, future), ...], "size": int, "timer": TimerHandle}
+        self._batches: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        # The loop only keeps weak references to tasks; hold running flushes
+        # here so one can't be garbage-collected with its waiters still pending
+        self._flush_tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, space: str, title: str, keys: List[str]) -> Dict[str, Any]:
+        """Queue keys for a coalesced sync and wait for this caller's share of the result."""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        target = (space, title)
+        batch = self._batches.get(target)
+        if batch is None:
+            # The flush runs as its own task, so a cancelled submitter can't strand the others
+            timer = loop.call_later(self._window, self._start_flush, target)
+            batch = self._batches[target] = {"items": [], "size": 0, "timer": timer}
+        batch["items"].append((keys, fut))
+        batch["size"] += len(keys)
+        if batch["size"] >= self._max_keys:
+            self._start_flush(target)
+        return await fut
+
+    def _start_flush(self, target: Tuple[str, str]) -> None:
+        task = asyncio.ensure_future(self._flush(target))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self, target: Tuple[str, str]) -> None:
+        batch = self._batches.pop(target, None)
+        if batch is None:
+            return
+        batch["timer"].cancel()
+        items = batch["items"]
+        space, title = target
+        merged = list(dict.fromkeys(k for keys, _ in items for k in keys))
+        logger.debug("[delta-batch] %s/%s: %d submitters, %d keys", space, title, len(items), len(merged))
+        try:
+            result = await self._sync(space, title, merged)
+            # Hand each submitter back only the part of the delta it asked for
+            delta = result.get("delta") or []
+            shares = []
+            for keys, fut in items:
+                wanted = set(keys)
+                shares.append((fut, {**result, "delta": [entry for entry in delta if entry.get("column") in wanted]}))
+        except Exception as e:
+            # Any failure (including a non-dict tool result) must reach every waiter
+            for _, fut in items:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        for fut, share in shares:
+            if not fut.done():
+                fut.set_result(share)
@@ -2,11 +2,55 @@
 Utility functions for MCP session management and status checking.
 """
 
+import os
 import logging
 from typing import Optional, Dict, Any
 
+import httpx
+
+try:
+    import h2  # noqa: F401 -- optional, lets httpx multiplex calls over HTTP/2
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Connection pool limits for the HTTP transport behind every MCP session.
+# Concurrent call_tool() invocations share these keep-alive connections instead
+# of paying a fresh TCP/TLS handshake each time the pool runs dry.
+MCP_HTTP_LIMITS = httpx.Limits(
+    max_keepalive_connections=int(os.getenv("MCP_HTTP_MAX_KEEPALIVE", "64")),
+    max_connections=int(os.getenv("MCP_HTTP_MAX_CONNECTIONS", "128")),
+)
+
+# Number of MCP sessions opened per connection. Handlers check one out per
+# request so long LLM tool loops don't share a single session's streams.
+MCP_SESSION_POOL_SIZE = max(1, int(os.getenv("MCP_SESSION_POOL_SIZE", "4")))
+
+
+def create_pooled_mcp_http_client(
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[httpx.Timeout] = None,
+    auth: Optional[httpx.Auth] = None,
+) -> httpx.AsyncClient:
+    """
+    httpx client factory for ``streamablehttp_client(httpx_client_factory=...)``.
+
+    Mirrors the MCP SDK default (redirects followed, 30s/300s timeouts) but
+    raises the keep-alive pool limits and enables HTTP/2 when ``h2`` is
+    installed. The transport owns the client, so it is closed together with
+    the session by the application's exit stack.
+    """
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=timeout or httpx.Timeout(30.0, read=300.0),
+        auth=auth,
+        follow_redirects=True,
+        limits=MCP_HTTP_LIMITS,
+        http2=_HTTP2_AVAILABLE,
+    )
+
 
 def get_mcp_session_status() -> Dict[str, Any]:
     """
@@ -0,0 +1,74 @@
+"""
+SQL DDL parsing helpers used by the PR sync webhook.
+
+Kept free of FastAPI/MCP imports so the functions can be pickled into
+ProcessPoolExecutor workers without dragging the whole application along.
+"""
+
+from typing import List
+
+try:
+    import re2 as _re  # optional google-re2: linear-time DFA matching, no backtracking
+except ImportError:
+    import re as _re
+
+# Pattern sources use inline flags so they compile identically under re and re2
+# (no lookarounds or backreferences, which re2 doesn't support).
+_TABLE_SRC = r'(?i)CREATE\s+TABLE\s+\[?[A-Za-z0-9_]+\]?\.\[?([A-Za-z0-9_]+)\]?'
+# Line-anchored patterns for the single pass over the column block:
+# the CREATE TABLE header line, the closing ")" line, and "[Column] <type>" lines
+_CREATE_LINE_SRC = r'(?im)^[ \t]*CREATE TABLE[^\n]*\n?'
+_CLOSE_LINE_SRC = r'(?m)^[ \t]*\)'
+_COLUMN_SRC = r'(?m)^[ \t]*\[([^\]\r\n]+)\][ \t]+\S'
+_SOURCES = (_TABLE_SRC, _CREATE_LINE_SRC, _CLOSE_LINE_SRC, _COLUMN_SRC)
+
+# Compiled once at import; parse_sql_keys runs for every SQL file in a PR.
+# The bytes set serves callers that already hold the raw file.
+_STR_PATTERNS = tuple(_re.compile(src) for src in _SOURCES)
+_BYTES_PATTERNS = tuple(_re.compile(src.encode("ascii")) for src in _SOURCES)
+
+
+def _scan(sql, patterns):
+    """Return (table_name, [column, ...]) from a CREATE TABLE script, as str or bytes like the input."""
+    table_re, create_re, close_re, column_re = patterns
+
+    # 1) Find the table name
+    table_match = table_re.search(sql)
+    if not table_match:
+        raise ValueError("Could not find CREATE TABLE statement with a table name")
+    table_name = table_match.group(1)
+
+    # 2) Column block: from the line after the CREATE TABLE header up to the
+    #    first line starting with ")"
+    header = create_re.search(sql)
+    if not header:
+        return table_name, []
+    start = header.end()
+    close = close_re.search(sql, start)
+    end = close.start() if close else len(sql)
+
+    # 3) Match "[ColumnName] ..." lines inside the block in one C-level scan
+    return table_name, column_re.findall(sql, start, end)
+
+
+def parse_sql_keys(sql_text: str, only_new: bool = False) -> List[str]:
+    """
+    Extract column names from a CREATE TABLE (…) block and
+    return them as 'TableName.ColumnName', inferring TableName
+    from the CREATE TABLE header in the SQL.
+    """
+    table_name, columns = _scan(sql_text, _STR_PATTERNS)
+    prefix = table_name + "."
+    return [prefix + col for col in columns]
+
+
+def parse_sql_keys_bytes(sql_bytes: bytes, only_new: bool = False) -> List[str]:
+    """
+    Byte-level variant of parse_sql_keys for UTF-8 encoded scripts.
+
+    Scans the compact one-byte-per-char buffer and decodes only the
+    matched identifiers.
+    """
+    table_name, columns = _scan(sql_bytes, _BYTES_PATTERNS)
+    prefix = table_name + b"."
+    return [(prefix + col).decode("utf-8") for col in columns]
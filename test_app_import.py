@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Import smoke test: the FastAPI app module must load (logging, middleware, routers)
+"""
+import logging.handlers
+
+import pytest
+
+
+def test_client_module_imports():
+    """Importing app.client configures logging and builds the app without errors"""
+    for dep in ("fastapi", "sqlalchemy", "mcp", "dotenv"):
+        pytest.importorskip(dep)
+
+    import app.client as client
+
+    assert client.app is not None
+    # Root logging goes through the queue drained by the background listener
+    handler = logging.getLogger().handlers[0]
+    assert isinstance(handler, logging.handlers.QueueHandler)
+    assert handler.queue is client._log_queue
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for coalescing Confluence delta syncs from concurrent PR webhooks
+"""
+import asyncio
+
+from app.utils.delta_batch import DeltaBatcher
+
+
+def test_submitters_are_merged_and_split():
+    """Two submitters for one page share a single sync call and get back only their keys"""
+    calls = []
+
+    async def sync(space, title, keys):
+        calls.append((space, title, keys))
+        return {"delta": [{"column": k} for k in keys], "updated": {"version": 2}}
+
+    async def run():
+        batcher = DeltaBatcher(sync, window=0.01)
+        return await asyncio.gather(
+            batcher.submit("SPACE", "Page", ["t.a", "t.b"]),
+            batcher.submit("SPACE", "Page", ["t.b", "t.c"]),
+        )
+
+    first, second = asyncio.run(run())
+    assert calls == [("SPACE", "Page", ["t.a", "t.b", "t.c"])]
+    assert first == {"delta": [{"column": "t.a"}, {"column": "t.b"}], "updated": {"version": 2}}
+    assert second == {"delta": [{"column": "t.b"}, {"column": "t.c"}], "updated": {"version": 2}}
+
+
+def test_different_pages_are_not_merged():
+    """Batches are per (space, title)"""
+    calls = []
+
+    async def sync(space, title, keys):
+        calls.append(title)
+        return {"delta": []}
+
+    async def run():
+        batcher = DeltaBatcher(sync, window=0.01)
+        await asyncio.gather(batcher.submit("S", "One", ["a"]), batcher.submit("S", "Two", ["b"]))
+
+    asyncio.run(run())
+    assert sorted(calls) == ["One", "Two"]
+
+
+def test_full_batch_flushes_before_the_window():
+    """Reaching max_keys flushes immediately instead of waiting out the window"""
+    async def sync(space, title, keys):
+        return {"delta": [{"column": k} for k in keys]}
+
+    async def run():
+        batcher = DeltaBatcher(sync, window=60, max_keys=2)
+        return await asyncio.wait_for(batcher.submit("S", "P", ["a", "b"]), timeout=1)
+
+    assert asyncio.run(run()) == {"delta": [{"column": "a"}, {"column": "b"}]}
+
+
+def test_sync_error_reaches_every_waiter():
+    """An MCP failure is raised in every coalesced caller"""
+    async def sync(space, title, keys):
+        raise RuntimeError("mcp down")
+
+    async def run():
+        batcher = DeltaBatcher(sync, window=0.01)
+        return await asyncio.gather(
+            batcher.submit("S", "P", ["a"]),
+            batcher.submit("S", "P", ["b"]),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert len(results) == 2
+    assert all(isinstance(r, RuntimeError) and str(r) == "mcp down" for r in results)
+
+
+def test_malformed_result_reaches_every_waiter():
+    """A non-dict tool result fails every caller instead of leaving them waiting"""
+    async def sync(space, title, keys):
+        return ["not", "a", "dict"]
+
+    async def run():
+        batcher = DeltaBatcher(sync, window=0.01)
+        return await asyncio.wait_for(
+            asyncio.gather(batcher.submit("S", "P", ["a"]), batcher.submit("S", "P", ["b"]), return_exceptions=True),
+            timeout=1,
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, AttributeError) for r in results)
+
+
+def test_flush_tasks_are_held_until_done():
+    """Running flushes are strongly referenced, then released when finished"""
+    release = None
+
+    async def sync(space, title, keys):
+        await release.wait()
+        return {"delta": []}
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        batcher = DeltaBatcher(sync, window=0.01)
+        waiter = asyncio.ensure_future(batcher.submit("S", "P", ["a"]))
+        await asyncio.sleep(0.05)
+        assert len(batcher._flush_tasks) == 1
+        release.set()
+        await waiter
+        await asyncio.sleep(0)
+        assert not batcher._flush_tasks
+
+    asyncio.run(run())
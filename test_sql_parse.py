@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the CREATE TABLE column-key parser used by the PR sync webhook
+"""
+import pytest
+
+from app.utils.sql_parse import parse_sql_keys, parse_sql_keys_bytes
+
+BASIC_SQL = (
+    "CREATE TABLE [dbo].[Orders] (\n"
+    "    [Id] INT NOT NULL,\n"
+    "    [CustomerName] NVARCHAR(100) NULL,\n"
+    "    [CreatedAt] DATETIME2 NOT NULL\n"
+    ")\n"
+    "GO\n"
+    "    [NotAColumn] INT\n"
+)
+BASIC_KEYS = ["Orders.Id", "Orders.CustomerName", "Orders.CreatedAt"]
+
+
+def both(sql):
+    """Run the str and bytes parsers and check they agree."""
+    from_str = parse_sql_keys(sql)
+    from_bytes = parse_sql_keys_bytes(sql.encode("utf-8"))
+    assert from_str == from_bytes
+    return from_str
+
+
+def test_basic_block():
+    """Columns inside the block are returned in order; lines after ')' are ignored"""
+    assert both(BASIC_SQL) == BASIC_KEYS
+
+
+def test_crlf_line_endings():
+    """Windows line endings parse the same as LF"""
+    assert both(BASIC_SQL.replace("\n", "\r\n")) == BASIC_KEYS
+
+
+def test_tab_indentation():
+    """Tab-indented column and closing lines are recognised"""
+    sql = "CREATE TABLE [dbo].[Orders] (\n\t[Id] INT,\n\t\t[Total]\tMONEY\n\t)\n\t[After] INT\n"
+    assert both(sql) == ["Orders.Id", "Orders.Total"]
+
+
+def test_bare_column_lines_are_skipped():
+    """A '[col]' with no type after it (or only trailing whitespace) is not a column"""
+    sql = "CREATE TABLE [dbo].[Orders] (\n    [Id] INT,\n    [Bare]\n    [Trailing]   \n    [Name] TEXT\n)\n"
+    assert both(sql) == ["Orders.Id", "Orders.Name"]
+
+
+def test_unterminated_block_runs_to_end():
+    """Without a closing ')' line every column to the end of the script is kept"""
+    sql = "CREATE TABLE [dbo].[Orders] (\n    [Id] INT,\n    [Name] TEXT"
+    assert both(sql) == ["Orders.Id", "Orders.Name"]
+
+
+def test_case_insensitive_header_and_unbracketed_names():
+    """Lower-case DDL and an unbracketed schema.table header are accepted"""
+    sql = "create table dbo.Orders (\n  [Id] int\n)\n"
+    assert both(sql) == ["Orders.Id"]
+
+
+def test_no_header_line_returns_no_columns():
+    """A table name found mid-line but no line starting with CREATE TABLE yields no columns"""
+    sql = "-- CREATE TABLE [dbo].[Orders]\n    [Id] INT\n"
+    assert both(sql) == []
+
+
+def test_missing_create_table_raises():
+    """Scripts without a CREATE TABLE schema.table header are rejected"""
+    with pytest.raises(ValueError):
+        parse_sql_keys("SELECT 1\n")
+    with pytest.raises(ValueError):
+        parse_sql_keys_bytes(b"SELECT 1\n")
+
+
+def test_non_ascii_column_names_decode():
+    """The bytes variant decodes matched identifiers as UTF-8"""
+    sql = "CREATE TABLE [dbo].[Orders] (\n    [Größe] INT\n)\n"
+    assert both(sql) == ["Orders.Größe"]